@@ -0,0 +1,164 @@
+import os
+import shutil
+import pathlib
+from conan import ConanFile
+from conan.errors import ConanException
+from conan.tools import files, scm
+
+required_conan_version = ">=2.5.0"
+
+
+# noinspection PyUnresolvedReferences
+class EmbeddedPythonBootstrap(ConanFile):
+    name = "embedded_python-bootstrap"
+    version = "1.0.0"  # of the Conan package, `embedded_python-core:version` is the Python version
+    license = "PSFL"
+    description = "Python environment with pip used to build `embedded_python` (not for runtime)"
+    topics = "embedded", "python"
+    homepage = "https://www.python.org/"
+    url = "https://github.com/lumicks/embedded_python"
+    settings = "os", "arch"
+    options = {
+        "pip_version": ["ANY"],
+        "setuptools_version": ["ANY"],
+        "wheel_version": ["ANY"],
+    }
+    default_options = {
+        "pip_version": "25.1.1",
+        "setuptools_version": "80.9.0",
+        "wheel_version": "0.45.1",
+    }
+    package_type = "application"
+
+    def requirements(self):
+        self.requires(f"embedded_python-core/1.4.0@{self.user}/{self.channel}")
+
+    def package_id(self):
+        # The Python version is an option of `-core` so we must depend on its full package ID
+        self.info.requires["embedded_python-core"].full_package_mode()
+
+    @property
+    def pyversion(self):
+        """Full Python version that we want to package, e.g. 3.11.5"""
+        return scm.Version(self.dependencies["embedded_python-core"].options.version)
+
+    @property
+    def short_pyversion(self):
+        """The first two components of the version number, e.g. 3.11"""
+        return scm.Version(".".join(str(self.pyversion).split(".")[:2]))
+
+    @property
+    def int_pyversion(self):
+        """The first two components of the version number in integer form, e.g. 311"""
+        return scm.Version("".join(str(self.pyversion).split(".")[:2]))
+
+    @property
+    def abiflags(self):
+        """`t` for the free-threaded build of `embedded_python-core`, otherwise empty"""
+        free_threaded = self.dependencies["embedded_python-core"].options.get_safe("free_threaded")
+        return "t" if free_threaded else ""
+
+    @property
+    def ldversion(self):
+        """Version and ABI flags as used in file and folder names, e.g. 3.13t or 3.13"""
+        return f"{self.short_pyversion}{self.abiflags}"
+
+    @property
+    def core_pkg(self):
+        return pathlib.Path(self.dependencies["embedded_python-core"].package_folder)
+
+    @property
+    def py_exe(self):
+        if self.settings.os == "Windows":
+            return pathlib.Path(self.package_folder, "embedded_python/python")
+        else:
+            return pathlib.Path(self.package_folder, "embedded_python/bin/python3")
+
+    @property
+    def wheelhouse(self):
+        """See `embedded_python`: `-c user.embedded_python:wheelhouse=<path>`"""
+        path = self.conf.get("user.embedded_python:wheelhouse", check_type=str)
+        return pathlib.Path(path) if path else None
+
+    @property
+    def offline(self):
+        """See `embedded_python`: `-c user.embedded_python:offline=True`"""
+        return self.conf.get("user.embedded_python:offline", default=False, check_type=bool)
+
+    @property
+    def _pip_source_args(self):
+        """Arguments which make `pip` look for packages in the `wheelhouse` (first or only)"""
+        if not self.wheelhouse:
+            if self.offline:
+                raise ConanException("`user.embedded_python:offline` requires a `wheelhouse`")
+            return ""
+        options = f'--find-links "{self.wheelhouse}"'
+        return f"--no-index {options}" if self.offline else options
+
+    def _run_py(self, command, **kwargs):
+        """Run `command` with the bootstrap Python, see `embedded_python._run_bootstrap_py()`"""
+        self.run(f'"{self.py_exe}" -E -s {command}', **kwargs)
+
+    def _get_pip(self):
+        """Install `pip` on Windows (the embeddable package doesn't include it)
+
+        In offline mode, `get-pip.py` must be provided in the `wheelhouse`. Otherwise, it's
+        downloaded and saved in the `wheelhouse` (if there is one) for future offline builds.
+        """
+        if self.offline:
+            shutil.copy(self.wheelhouse / "get-pip.py", "get-pip.py")
+        else:
+            files.download(self, "https://bootstrap.pypa.io/get-pip.py", filename="get-pip.py")
+            if self.wheelhouse and not (self.wheelhouse / "get-pip.py").exists():
+                self.wheelhouse.mkdir(parents=True, exist_ok=True)
+                tmp = self.wheelhouse / f".get-pip.py.{os.getpid()}.tmp"
+                shutil.copyfile("get-pip.py", tmp)
+                os.replace(tmp, self.wheelhouse / "get-pip.py")
+        self._run_py(f"get-pip.py {self._pip_source_args}")
+
+    def package(self):
+        """Set up a special embedded Python environment for bootstrapping
+
+        The regular embedded Python package doesn't have pip and it doesn't automatically add
+        a script's parent directory to the module path (to restrict the embedded environment).
+        We want to keep those stricter embedded rules for our final package but we first need
+        to install some packages. For that, we take another copy of the `-core` package and
+        modify it for bootstrapping the final environment.
+
+        This used to be done in the `build()` of every `embedded_python` package. As a separate
+        package, it's built once per Python version and set of tool versions and then reused.
+        """
+        bootstrap = pathlib.Path(self.package_folder, "embedded_python")
+        files.copy(self, "*", src=self.core_pkg / "embedded_python", dst=bootstrap)
+        license_folder = pathlib.Path(self.package_folder, "licenses")
+        files.copy(self, "LICENSE.txt", src=self.core_pkg / "licenses", dst=license_folder)
+
+        # Deleting the ._pth file restores regular (non-embedded) module path rules
+        if self.settings.os != "Windows":
+            os.remove(bootstrap / f"python{self.ldversion}._pth")
+        else:
+            os.remove(bootstrap / f"python{self.int_pyversion}._pth")
+            # Moving files to the `DLLs` folder restores non-embedded folder structure
+            dlls = bootstrap / "DLLs"
+            dlls.mkdir(exist_ok=True)
+            for file in bootstrap.glob("*.pyd"):
+                file.rename(dlls / file.name)
+            # We need pip to install packages
+            self._get_pip()
+
+        specs = [
+            f"pip=={self.options.pip_version}",
+            f"setuptools=={self.options.setuptools_version}",
+            f"wheel=={self.options.wheel_version}",
+        ]
+        if self.wheelhouse and not self.offline:
+            # Keep the bootstrap packages (with dependencies) around for future offline builds
+            options = f'{self._pip_source_args} --dest "{self.wheelhouse}"'
+            self._run_py(f"-m pip download {options} {' '.join(specs)}")
+        options = f"--no-warn-script-location --upgrade {self._pip_source_args}"
+        self._run_py(f"-m pip install {options} {' '.join(specs)}")
+
+    def package_info(self):
+        self.cpp_info.includedirs = []
+        self.cpp_info.bindirs = []
+        self.cpp_info.libdirs = []
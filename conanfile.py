@@ -1,7 +1,21 @@
+import io
 import os
 import re
+import sys
+import csv
+import json
+import stat
+import shutil
 import pathlib
+import zipfile
+import datetime
+import hashlib
+import subprocess
+import uuid
+import concurrent.futures
+from email.parser import HeaderParser
 from conan import ConanFile
+from conan.errors import ConanException, ConanInvalidConfiguration
 from conan.tools import files, scm
 
 required_conan_version = ">=2.5.0"
@@ -20,21 +34,107 @@ class EmbeddedPython(ConanFile):
     options = {
         "packages": [None, "ANY"],
         "pip_version": ["ANY"],
-        "pip_licenses_cli_version": ["ANY"],
         "setuptools_version": ["ANY"],
         "wheel_version": ["ANY"],
+        "pyc_invalidation_mode": ["no", "timestamp", "checked-hash", "unchecked-hash"],
+        "pyc_optimization_level": ["0", "1", "2"],
+        "zip_site_packages": ["no", "stored", "deflated"],
+        "import_report": [False, True],
+        "import_budget": [None, "ANY"],
+        "install_mode": ["pip", "parallel", "layered"],
+        "strip_binaries": ["no", "yes", "split"],
+        "trim_stdlib": [False, True],
+        "stdlib_keep": [None, "ANY"],
+        "module_index": [False, True],
+        "image": [False, True],
+        "lazy_imports": [None, "ANY"],
+        "dedupe_libraries": [False, True],
     }
     default_options = {
         "packages": None,
         "pip_version": "25.1.1",
-        "pip_licenses_cli_version": "1.4.0",
         "setuptools_version": "80.9.0",
         "wheel_version": "0.45.1",
+        "pyc_invalidation_mode": "unchecked-hash",
+        "pyc_optimization_level": "0",
+        "zip_site_packages": "no",
+        "import_report": False,
+        "import_budget": None,
+        "install_mode": "pip",
+        "strip_binaries": "no",
+        "trim_stdlib": False,
+        "stdlib_keep": None,
+        "module_index": False,
+        "image": False,
+        "lazy_imports": None,
+        "dedupe_libraries": False,
     }
-    exports_sources = "embedded_python.cmake"
+    exports_sources = "embedded_python.cmake", "scripts/*", "runtime/*"
+
+    def config_options(self):
+        """Windows binaries are not stripped: the debug info is already in separate `.pdb` files"""
+        if self.settings.os == "Windows":
+            del self.options.strip_binaries
+            del self.options.dedupe_libraries
+
+    def configure(self):
+        if not self.options.trim_stdlib:
+            self.options.rm_safe("stdlib_keep")
+        if not self.options.packages:
+            return
+
+        bootstrap = self.options["embedded_python-bootstrap"]
+        bootstrap.pip_version = self.options.pip_version
+        bootstrap.setuptools_version = self.options.setuptools_version
+        bootstrap.wheel_version = self.options.wheel_version
 
     def requirements(self):
         self.requires(f"embedded_python-core/1.4.0@{self.user}/{self.channel}")
+        if self.options.packages:
+            # Only needed to install the packages: not propagated to consumers
+            self.requires(
+                f"embedded_python-bootstrap/1.0.0@{self.user}/{self.channel}", visible=False
+            )
+
+    def validate(self):
+        budget = self.options.import_budget
+        if budget and not self.options.import_report:
+            raise ConanInvalidConfiguration("`import_budget` requires `import_report=True`")
+        if budget and not pathlib.Path(str(budget)).is_file():
+            raise ConanInvalidConfiguration(f"`import_budget` file not found: {budget}")
+        if budget:
+            self._validate_import_budget(str(budget))
+
+        if self.options.trim_stdlib:
+            core_options = self.dependencies["embedded_python-core"].options
+            if core_options.get_safe("zip_stdlib") == "no":
+                raise ConanInvalidConfiguration(
+                    "`trim_stdlib` requires `embedded_python-core/*:zip_stdlib` to be enabled"
+                )
+        if self.options.image:
+            core_options = self.dependencies["embedded_python-core"].options
+            if core_options.get_safe("zip_stdlib") == "no":
+                raise ConanInvalidConfiguration(
+                    "`image` requires `embedded_python-core/*:zip_stdlib` to be enabled"
+                )
+            # Otherwise, all of `site-packages` would be extracted from the image on first use
+            if self.options.packages and self.options.zip_site_packages == "no":
+                raise ConanInvalidConfiguration(
+                    "`image` requires `zip_site_packages` with `packages`"
+                )
+
+    def package_id(self):
+        # The budget only decides if the build passes, it doesn't change the package contents
+        del self.info.options.import_budget
+        # The Python version and ABI (e.g. `free_threaded`) are options of `-core` and they
+        # decide which wheels are installed, so we must depend on its full package ID
+        self.info.requires["embedded_python-core"].full_package_mode()
+        # Equivalent requirements with cosmetic differences (order, separators, case, comments)
+        # must result in the same package, see `make_package_list()`. Note that `self.options`
+        # can't be accessed here.
+        if self.info.options.packages:
+            packages = "\n".join(self._canonical_package_list(str(self.info.options.packages)))
+            self.info.options.packages = hashlib.sha256(packages.encode()).hexdigest()
 
     @property
     def pyversion(self):
@@ -51,16 +151,28 @@ class EmbeddedPython(ConanFile):
         """The first two components of the version number in integer form, e.g. 311"""
         return scm.Version("".join(str(self.pyversion).split(".")[:2]))
 
+    @property
+    def abiflags(self):
+        """`t` for the free-threaded build of `embedded_python-core`, otherwise empty"""
+        free_threaded = self.dependencies["embedded_python-core"].options.get_safe("free_threaded")
+        return "t" if free_threaded else ""
+
+    @property
+    def ldversion(self):
+        """Version and ABI flags as used in file and folder names, e.g. 3.13t or 3.13"""
+        return f"{self.short_pyversion}{self.abiflags}"
+
     @property
     def core_pkg(self):
         return pathlib.Path(self.dependencies["embedded_python-core"].package_folder)
 
     @property
     def bootstrap_py_exe(self):
+        bootstrap = pathlib.Path(self.dependencies["embedded_python-bootstrap"].package_folder)
         if self.settings.os == "Windows":
-            return pathlib.Path(self.build_folder, "bootstrap/python")
+            return bootstrap / "embedded_python/python"
         else:
-            return pathlib.Path(self.build_folder, "bootstrap/bin/python3")
+            return bootstrap / "embedded_python/bin/python3"
 
     @property
     def package_py_exe(self):
@@ -69,10 +181,69 @@ class EmbeddedPython(ConanFile):
         else:
             return pathlib.Path(self.package_folder, "embedded_python/bin/python3")
 
-    def make_package_list(self):
-        """Create a list of package names based on `self.options.packages`
+    @property
+    def wheelhouse(self):
+        """Optional persistent directory of wheels which is shared between package builds
+
+        Set via `-c user.embedded_python:wheelhouse=<path>`. It's a conf rather than an option
+        since the location of the cache has no influence on the package contents.
+        """
+        path = self.conf.get("user.embedded_python:wheelhouse", check_type=str)
+        return pathlib.Path(path) if path else None
+
+    @property
+    def offline(self):
+        """Install exclusively from the `wheelhouse`: `-c user.embedded_python:offline=True`"""
+        return self.conf.get("user.embedded_python:offline", default=False, check_type=bool)
+
+    @property
+    def layer_cache(self):
+        """Persistent directory of per-wheel installations for `install_mode=layered`
+
+        Set via `-c user.embedded_python:layer_cache=<path>`. It should be on the same filesystem
+        as the Conan cache so that the package can be composed using hardlinks.
+        """
+        path = self.conf.get("user.embedded_python:layer_cache", check_type=str)
+        return pathlib.Path(path) if path else pathlib.Path(self.build_folder, "layers")
+
+    @property
+    def wheels_folder(self):
+        """Wheels for exactly the packages of this environment, see `_build_wheels()`"""
+        return pathlib.Path(self.build_folder, "wheels")
 
-        For details of the `self.options.packages` format see `make_requirements_file`
+    @property
+    def site_packages(self):
+        """Location of the `pip` packages in the final environment"""
+        prefix = pathlib.Path(self.package_folder, "embedded_python")
+        if self.settings.os == "Windows":
+            return prefix / "Lib/site-packages"
+        else:
+            return prefix / f"lib/python{self.ldversion}/site-packages"
+
+    @property
+    def pth_file(self):
+        """The `._pth` file which defines `sys.path` in isolated mode, see `embedded_python-core`"""
+        prefix = pathlib.Path(self.package_folder, "embedded_python")
+        if self.settings.os == "Windows":
+            return prefix / f"python{self.int_pyversion}._pth"
+        else:
+            return prefix / f"python{self.ldversion}._pth"
+
+    @property
+    def stdlib_zip(self):
+        """The zipped standard library, see `embedded_python-core._zip_stdlib()`"""
+        prefix = pathlib.Path(self.package_folder, "embedded_python")
+        if self.settings.os == "Windows":
+            return prefix / f"python{self.int_pyversion}.zip"
+        else:
+            return prefix / f"lib/python{self.int_pyversion}{self.abiflags}.zip"
+
+    @staticmethod
+    def _split_packages(packages):
+        """The requirements from the `packages` option string, as written, without comments
+
+        Like `pip install -r`, lines ending with `\\` are continued on the next line. Options
+        which belong to a requirement (e.g. `--hash`) stay with it even if they are separated.
         """
 
         def split_lines(string):
@@ -86,8 +257,79 @@ class EmbeddedPython(ConanFile):
                     return string.split(separator)
             return string.split(" ")
 
-        packages_str = str(self.options.packages).strip()
-        return split_lines(packages_str)
+        text = re.sub(r"\\[ \t]*\n", " ", "\n".join(split_lines(packages.strip())))
+        lines = (re.sub(r"(^|\s)#.*$", "", line).strip() for line in text.split("\n"))
+        requirements = []
+        for line in lines:
+            if requirements and line.startswith(("--hash", "--config-settings", "-C")):
+                requirements[-1] += f" {line}"
+            elif line:
+                requirements.append(line)
+        return requirements
+
+    @staticmethod
+    def _canonical_requirement(line):
+        """Normalize a single requirement without changing what it installs
+
+        The name and extras are normalized per PEP 503, whitespace is removed from the version
+        specifiers which are sorted, and whitespace in environment markers is collapsed. Anything
+        else (`pip` options, paths, URLs, per-requirement options) is kept as written.
+        """
+        line, *options = re.split(r"\s+(?=(?:--hash|--config-settings|-C)\b)", line, maxsplit=1)
+        if options:
+            requirement = EmbeddedPython._canonical_requirement(line)
+            return f"{requirement} {' '.join(options[0].split())}"
+
+        match = re.match(r"^([A-Za-z0-9][A-Za-z0-9._-]*)\s*(\[[^\]]*\])?\s*(.*)$", line)
+        if not match:
+            return line
+        name, extras, rest = match.groups()
+        if (rest and rest[0] not in "=<>!~@;") or " -" in rest:
+            return " ".join(line.split())
+
+        def normalize(name):
+            return re.sub(r"[-_.]+", "-", name).lower()
+
+        name = normalize(name)
+        if extras:
+            extras = {normalize(e.strip()) for e in extras[1:-1].split(",") if e.strip()}
+            name += f"[{','.join(sorted(extras))}]" if extras else ""
+        if rest.startswith("@"):  # direct reference: the URL may contain `;`
+            return f"{name} {' '.join(rest.split())}"
+        spec, separator, marker = rest.partition(";")
+        spec = ",".join(sorted(s for s in "".join(spec.split()).split(",") if s))
+        return f"{name}{spec}" + (f"; {' '.join(marker.split())}" if separator else "")
+
+    @classmethod
+    def _canonical_package_list(cls, packages):
+        """The canonical list of requirements in the `packages` option string
+
+        Comments and blank lines are dropped, each requirement is normalized (see
+        `_canonical_requirement()`) and the list is sorted and deduplicated. The same set of
+        requirements results in the same list (and `package_id`) regardless of how it's written.
+        """
+        return sorted({cls._canonical_requirement(line) for line in cls._split_packages(packages)})
+
+    def make_package_list(self):
+        """Create the canonical list of requirements based on `self.options.packages`
+
+        See `_canonical_package_list()`. For details of the `self.options.packages` format see
+        `make_requirements_file`.
+        """
+        return self._canonical_package_list(str(self.options.packages))
+
+    def _check_package_list(self):
+        """Ensure that the canonical list of requirements installs exactly what was requested
+
+        Each original requirement is compared to its canonical form using `pip`'s own parser,
+        see `scripts/check_requirements.py`.
+        """
+        lines = self._split_packages(str(self.options.packages))
+        pairs = [[line, self._canonical_requirement(line)] for line in lines]
+        pairs_file = pathlib.Path("requirements_check.json").resolve()
+        pairs_file.write_text(json.dumps(pairs))
+        script = pathlib.Path(self.source_folder, "scripts/check_requirements.py")
+        self._run_bootstrap_py(f'"{script}" "{pairs_file}"')
 
     def _make_requirements_file(self, extra_packages=None):
         """Create a `requirements.txt` based on `self.options.packages` and return its path
@@ -109,43 +351,55 @@ class EmbeddedPython(ConanFile):
             f.write("\n".join(packages_list))
         return filepath
 
-    def _build_bootstrap(self):
-        """Set up a special embedded Python environment for bootstrapping
+    @property
+    def _pip_source_args(self):
+        """Arguments which make `pip` look for packages in the `wheelhouse` (first or only)"""
+        if not self.wheelhouse:
+            if self.offline:
+                raise ConanException("`user.embedded_python:offline` requires a `wheelhouse`")
+            return ""
+        options = f'--find-links "{self.wheelhouse}"'
+        return f"--no-index {options}" if self.offline else options
+
+    def _add_to_wheelhouse(self, file):
+        """Copy `file` into the `wheelhouse` unless an identically named file is already there
 
-        The regular embedded Python package doesn't have pip and it doesn't automatically add
-        a script's parent directory to the module path (to restrict the embedded environment).
-        We want to keep those stricter embedded rules for our final package but we first need
-        to install some packages. For that, we download another embedded package and modify
-        it for bootstrapping the final environment.
+        Wheel file names are unique keys: `{name}-{version}-{python}-{abi}-{platform}.whl`. The
+        copy goes via a temporary file and an atomic rename so that concurrent builds sharing the
+        same `wheelhouse` never see partial files.
         """
-        bootstrap = pathlib.Path(self.build_folder) / "bootstrap"
-        files.copy(self, "*", src=self.core_pkg / "embedded_python", dst=bootstrap)
+        target = self.wheelhouse / file.name
+        if target.exists():
+            return
+        self.wheelhouse.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        shutil.copyfile(file, tmp)
+        os.replace(tmp, target)
 
-        # Deleting the ._pth file restores regular (non-embedded) module path rules
-        if self.settings.os != "Windows":
-            os.remove(bootstrap / f"python{self.short_pyversion}._pth")
-        else:
-            os.remove(bootstrap / f"python{self.int_pyversion}._pth")
-            # Moving files to the `DLLs` folder restores non-embedded folder structure
-            dlls = bootstrap / "DLLs"
-            dlls.mkdir(exist_ok=True)
-            for file in bootstrap.glob("*.pyd"):
-                file.rename(dlls / file.name)
-            # We need pip to install packages
-            files.download(self, "https://bootstrap.pypa.io/get-pip.py", filename="get-pip.py")
-            self._run_bootstrap_py("get-pip.py")
-
-        specs = [
-            f"pip=={self.options.pip_version}",
-            f"setuptools=={self.options.setuptools_version}",
-            f"wheel=={self.options.wheel_version}",
-            f"pip-licenses-cli=={self.options.pip_licenses_cli_version}",
-        ]
-        options = "--no-warn-script-location --upgrade"
-        self._run_bootstrap_py(f"-m pip install {options} {' '.join(specs)}")
+    def _build_wheels(self):
+        """Collect wheels for all packages in `wheels_folder`, reusing the `wheelhouse`
+
+        Packages are fully pinned and installed with `--no-deps` so this only needs to build or
+        fetch one wheel per requirement. `pip wheel` prefers wheels from `--find-links` over
+        identical ones from the index, so anything that's already in the `wheelhouse` is neither
+        downloaded nor rebuilt from source. New wheels are added to the `wheelhouse`.
+        """
+        # Some modules always assume that `setuptools` is installed (e.g. pytest)
+        requirements = self._make_requirements_file(
+            extra_packages=[f"setuptools=={self.options.setuptools_version}"]
+        )
+        options = f'--no-deps --wheel-dir "{self.wheels_folder}" {self._pip_source_args}'
+        self._run_bootstrap_py(f"-m pip wheel {options} -r {requirements}")
+
+        if self.wheelhouse and not self.offline:
+            for wheel in self.wheels_folder.glob("*.whl"):
+                self._add_to_wheelhouse(wheel)
 
     def _run_bootstrap_py(self, command, **kwargs):
-        """Run `command` with the Python created by `_build_bootstrap()`
+        """Run `command` with the Python from the `embedded_python-bootstrap` package
+
+        The bootstrap is a modified `-core` package with `pip` and the other tools which we need
+        to install packages, see `bootstrap/conanfile.py` for details.
 
         While we do need to mostly restore regular module path rules for the bootstrap, we still
         don't want to get conflicts with packages installed in the user's home directory. We can
@@ -158,14 +412,744 @@ class EmbeddedPython(ConanFile):
         """
         self.run(f"{self.bootstrap_py_exe} -E -s {command}", **kwargs)
 
-    def _gather_licenses(self, license_folder):
-        """Gather licenses for all packages using our bootstrap environment"""
-        self._run_bootstrap_py(
-            f"-m piplicenses --python={self.package_py_exe}"
-            " --with-system --from=mixed --format=plain-vertical"
-            " --with-license-file --no-license-path --output-file=package_licenses.txt",
-            cwd=license_folder,
+    def _install_wheels(self, prefix):
+        """Install the exact wheels from `build()`: no index lookups, downloads, or source builds
+
+        With `install_mode=parallel`, the wheels are unpacked concurrently, see the docstring of
+        `scripts/install_wheels.py`. The resulting environment is the same as with `pip`.
+
+        With `install_mode=layered`, each wheel is installed only once into its own layer in the
+        `layer_cache` and the environment is composed from those layers. When only a few packages
+        change, only those are installed and the rest of the package is hardlinked.
+        """
+        wheels = pathlib.Path(self.build_folder, "wheels.txt")
+        wheels.write_text("\n".join(str(w) for w in sorted(self.wheels_folder.glob("*.whl"))))
+        no_compile = self.options.pyc_invalidation_mode != "no"  # see `_precompile_site_packages()`
+
+        script = pathlib.Path(self.source_folder, "scripts/install_wheels.py")
+        script = f'"{script}"' + (" --no-compile" if no_compile else "")
+        if self.options.install_mode == "parallel":
+            self._run_bootstrap_py(f'{script} --prefix "{prefix}" "{wheels}"')
+        elif self.options.install_mode == "layered":
+            layers = pathlib.Path(self.build_folder, "layers.txt")
+            options = f'--layer-cache "{self.layer_cache}" --output "{layers}"'
+            self._run_bootstrap_py(f'{script} {options} "{wheels}"')
+            for layer in layers.read_text().splitlines():
+                self._link_tree(pathlib.Path(layer), prefix)
+        else:
+            options = f'--no-deps --ignore-installed --no-warn-script-location --prefix "{prefix}"'
+            options += " --no-index" + (" --no-compile" if no_compile else "")
+            self._run_bootstrap_py(f'-m pip install {options} -r "{wheels}"')
+
+    def _link_tree(self, src, dst):
+        """Recreate the `src` tree in `dst` using hardlinks, or copies if links are not possible
+
+        This is used to compose the package from immutable, cached parts (`-core` and the layers
+        of `install_mode=layered`) so that the files are stored only once on disk. Symlinks are
+        recreated as is. Any packaging stage that modifies a file must replace it rather than
+        writing to it in place (e.g. `_add_to_pth()`) so that the cached parts stay intact.
+        """
+        for root, dir_names, file_names in os.walk(src):
+            root = pathlib.Path(root)
+            target_root = dst / root.relative_to(src)
+            target_root.mkdir(parents=True, exist_ok=True)
+            for name in [d for d in dir_names if (root / d).is_symlink()] + file_names:
+                source, target = root / name, target_root / name
+                if target.is_symlink() or target.exists():
+                    target.unlink()
+                if source.is_symlink():
+                    os.symlink(os.readlink(source), target)
+                    continue
+                try:
+                    os.link(source, target)
+                except OSError:
+                    shutil.copy2(source, target)
+            dir_names[:] = [d for d in dir_names if not (root / d).is_symlink()]
+
+    def _precompile_site_packages(self, prefix, path=None):
+        """Precompile all of `site-packages` (or just `path`) into `.pyc` byte code
+
+        `pip` would compile the packages on install, but it uses the default timestamp-based
+        invalidation and bakes the absolute Conan package path into the byte code. Instead, we
+        follow `embedded_python-core`'s `_zip_stdlib()`: the environment is frozen after packaging
+        so there's no need to check the `.py` sources for changes on every import. And the final
+        environment is often deployed to a read-only location where Python can't write a cache,
+        so anything that isn't precompiled here would be compiled again on every start.
+
+        Unlike the standard library, the `.py` files stay in place (packages may read their own
+        sources, e.g. `inspect`) so the `.pyc` files go into the regular `__pycache__` folders.
+        Note that a `pyc_optimization_level` other than 0 is only useful if the embedding
+        application also sets `PyConfig.optimization_level` to match.
+        """
+        options = [
+            # Force the compilation even if a `.pyc` already exists.
+            "-f",
+            # Only print errors: there are many thousands of files.
+            "-q",
+            f"--invalidation-mode {self.options.pyc_invalidation_mode}",
+            f"-o{self.options.pyc_optimization_level}",
+            # Drop the Conan package directory from the byte code, same as the standard library.
+            f'-s "{prefix}"',
+            # Use as many compiler workers as there are CPU threads.
+            "-j0",
+        ]
+        target = path or self.site_packages
+        output = io.StringIO()
+        exit_code = self.run(
+            f'"{self.package_py_exe}" -m compileall {" ".join(options)} "{target}"',
+            stdout=output,
+            ignore_errors=True,
         )
+        # Some packages ship files that are not meant to be compiled (test data, templates, or
+        # code for other Python versions). `pip` ignores those as well. But a non-zero exit code
+        # without any per-file errors means that `compileall` itself failed.
+        failed = re.findall(r"^\*\*\* Error compiling (.+)\.\.\.$", output.getvalue(), re.M)
+        if exit_code != 0 and not failed:
+            raise ConanException(f"Failed to precompile `site-packages`:\n{output.getvalue()}")
+        if failed:
+            self.output.warning(
+                f"{len(failed)} files in `site-packages` could not be precompiled:\n"
+                + "\n".join(failed)
+            )
+
+    def _installed_distributions(self):
+        """Return a `dict` of `{dist_info_dir: [files]}` for all packages in `site-packages`
+
+        The file paths are taken from each distribution's `RECORD` and are relative to
+        `site-packages`. Files installed outside of it (e.g. scripts) start with `..`.
+        """
+        distributions = {}
+        for dist_info in sorted(self.site_packages.glob("*.dist-info")):
+            record = dist_info / "RECORD"
+            if not record.exists():
+                continue
+            with open(record, newline="", encoding="utf-8") as f:
+                distributions[dist_info] = [pathlib.PurePosixPath(row[0]) for row in csv.reader(f)]
+        return distributions
+
+    def _add_to_pth(self, entry):
+        """Add a `sys.path` entry (relative to the prefix) to the `._pth` file
+
+        The file is replaced rather than modified in place: it may be shared with the `-core`
+        package via a hardlink.
+        """
+        paths = self.pth_file.read_text().split("\n")
+        paths.append(entry)
+        self.pth_file.unlink()
+        self.pth_file.write_text("\n".join(paths))
+
+    def _enable_site(self):
+        """Make `site` run, and process our `.pth` files, despite the isolated `._pth` mode
+
+        The `._pth` file turns `site` off for the `python` exe and, on Windows, also for every
+        application which embeds the DLL next to it. An `import site` line turns it back on.
+        """
+        if "import site" not in self.pth_file.read_text().splitlines():
+            self._add_to_pth("import site")
+
+    def _zip_site_packages(self, prefix):
+        """Move all pure-Python distributions into a `site-packages.zip` next to `site-packages`
+
+        This follows `embedded_python-core`'s zipped standard library. Tens of thousands of small
+        files are slow to deploy, scan, and stat on import. Only distributions that are known to
+        work from a `.zip` are moved, everything else stays on disk:
+        - Extension modules and shared libraries can't be loaded from a `.zip`.
+        - Any other data files in a package are usually read via `__file__`.
+        - `.pth` files and legacy `not-zip-safe` markers need the package to be on disk.
+        Files installed outside of `site-packages` (e.g. scripts) are never moved.
+
+        `zipimport` only picks up `.pyc` files placed next to the `.py` source, so the byte code
+        from `__pycache__` (see `_precompile_site_packages()`) is renamed to the legacy location.
+        `zipimport` doesn't support optimization levels: for `pyc_optimization_level != 0`, only
+        the sources are zipped and they are compiled in memory on import.
+
+        The `.zip` is added to the `._pth` file (`python` executable and Windows embedding) and to
+        an `embedded_python.pth` file which `site` processes when embedding via `PyConfig`.
+        """
+        code_suffixes = {".py", ".pyc", ".pyi"}
+        unsafe_markers = {"not-zip-safe"}
+        cache_tag = f"cpython-{self.int_pyversion}"
+
+        def is_zip_safe(files):
+            for file in files:
+                if file.parts[0] == ".." or file.parts[0].endswith(".dist-info"):
+                    continue
+                if file.name in unsafe_markers or file.suffix == ".pth":
+                    return False
+                if file.suffix not in code_suffixes and file.name != "py.typed":
+                    return False
+            return True
+
+        def arcname(file):
+            """Map `pkg/__pycache__/mod.cpython-311.pyc` to `pkg/mod.pyc`"""
+            if file.parent.name == "__pycache__":
+                stem, tag, _ = file.name.rsplit(".", 2)
+                if tag != cache_tag:
+                    return None  # `.opt-N.pyc` or a different interpreter
+                return str(file.parent.parent / f"{stem}.pyc")
+            return str(file)
+
+        zip_name = self.site_packages.with_suffix(".zip")
+        compression = getattr(zipfile, f"ZIP_{str(self.options.zip_site_packages).upper()}")
+        moved, kept = [], []
+        with zipfile.ZipFile(zip_name, "w", compression) as zf:
+            for dist_info, records in self._installed_distributions().items():
+                if not is_zip_safe(records):
+                    kept.append(dist_info.name)
+                    continue
+
+                files_to_move = [self.site_packages / f for f in records if f.parts[0] != ".."]
+                for py_file in [f for f in files_to_move if f.suffix == ".py"]:
+                    # The byte code is not part of `RECORD`, see `_precompile_site_packages()`
+                    files_to_move += py_file.parent.glob(f"__pycache__/{py_file.stem}.*.pyc")
+                files_to_move = list(dict.fromkeys(files_to_move))
+
+                for file in files_to_move:
+                    name = arcname(pathlib.PurePosixPath(file.relative_to(self.site_packages)))
+                    if name and file.is_file():
+                        zf.write(file, arcname=name)
+
+                # Only remove files that belong to this distribution: folders may be shared with
+                # other distributions (namespace packages)
+                for file in files_to_move:
+                    file.unlink(missing_ok=True)
+                folders = {f.parent for f in files_to_move}
+                for folder in sorted(folders, key=lambda p: len(p.parts), reverse=True):
+                    while folder.exists() and folder != self.site_packages:
+                        if any(folder.iterdir()):
+                            break
+                        folder.rmdir()
+                        folder = folder.parent
+                moved.append(dist_info.name)
+
+        self.output.info(f"Zipped {len(moved)} distributions, kept {len(kept)} on disk: {kept}")
+        relative_zip = zip_name.relative_to(prefix).as_posix()
+        self._add_to_pth(relative_zip)
+        with open(self.site_packages / "embedded_python.pth", "w") as f:
+            f.write(f"../{zip_name.name}\n")
+
+    def _strip_site_packages(self):
+        """Strip the symbols from all extension modules and shared libraries in `site-packages`
+
+        See `embedded_python-strip.py` in `-core`, which strips its own binaries with its
+        `strip_binaries` option. With `split`, the debug info is kept in
+        `debug/embedded_python.debug.tar.xz` in the package. Some wheels ship binaries which
+        can't be processed by `strip`. Those are left as is with a warning.
+        """
+        script = self.core_pkg / "embedded_python-strip.py"
+        options = ""
+        if self.options.strip_binaries == "split":
+            archive = pathlib.Path(self.package_folder, "debug/embedded_python.debug.tar.xz")
+            options = f' --split "{archive}"'
+        self.run(f'"{sys.executable}" "{script}" "{self.site_packages}"{options}')
+
+    def _dedupe_vendored_libraries(self):
+        """Replace identical copies of vendored shared libraries with symlinks to a single copy
+
+        `auditwheel` (manylinux) and `delocate` (macOS) copy the external libraries of a wheel
+        into `<dist>.libs` or `<package>/.dylibs`. Wheels built against the same library each
+        bring their own copy, e.g. OpenBLAS or `libgfortran`. Byte-identical copies are replaced
+        by relative symlinks to the first one (in path order). The file names stay the same so
+        the `RPATH` and install names of the extension modules still resolve, and the dynamic
+        loader sees the same file: it's loaded once and its pages are shared. Symlinks (unlike
+        hardlinks) are kept by the deployment (`embedded_python.manifest`) and the `image`.
+
+        This runs after `_strip_site_packages()` which may change the contents. The duplicates
+        are unlinked rather than written: they may be hardlinks into the `layer_cache`. The
+        result is written to `reports/vendored_libraries.json`.
+        """
+        patterns = ["*.libs/*", "*/.libs/*", "**/.dylibs/*"]
+        libraries = sorted(
+            {
+                file
+                for pattern in patterns
+                for file in self.site_packages.glob(pattern)
+                if file.is_file() and not file.is_symlink()
+            }
+        )
+        by_size = {}
+        for file in libraries:
+            by_size.setdefault(file.stat().st_size, []).append(file)
+        candidates = [file for files in by_size.values() if len(files) > 1 for file in files]
+
+        def sha256(file):
+            h = hashlib.sha256()
+            with open(file, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+            return h.hexdigest()
+
+        def relative(file):
+            return file.relative_to(self.site_packages).as_posix()
+
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            hashes = dict(zip(candidates, executor.map(sha256, candidates)))
+        by_hash = {}
+        for file in candidates:
+            by_hash.setdefault(hashes[file], []).append(file)
+
+        groups, bytes_saved = [], 0
+        for digest, (original, *duplicates) in sorted(by_hash.items(), key=lambda x: x[1][0]):
+            if not duplicates:
+                continue
+            for file in duplicates:
+                file.unlink()
+                file.symlink_to(os.path.relpath(original, file.parent))
+            size = original.stat().st_size
+            bytes_saved += size * len(duplicates)
+            groups.append(
+                {
+                    "sha256": digest,
+                    "size": size,
+                    "kept": relative(original),
+                    "replaced": [relative(f) for f in duplicates],
+                }
+            )
+
+        report = {"libraries": len(libraries), "bytes_saved": bytes_saved, "duplicates": groups}
+        report_file = pathlib.Path(self.package_folder, "reports/vendored_libraries.json")
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+        report_file.write_text(json.dumps(report, indent=2))
+        replaced = sum(len(group["replaced"]) for group in groups)
+        self.output.info(
+            f"Vendored libraries: {len(libraries)}, replaced {replaced} duplicates with symlinks, "
+            f"saved {bytes_saved} bytes"
+        )
+
+    def _tool_scripts(self):
+        """The recipe's scripts and runtime modules, which mostly run with or in the package"""
+        source = pathlib.Path(self.source_folder)
+        return [
+            *sorted((source / "scripts").glob("*.py")),
+            *sorted((source / "runtime").glob("*.py")),
+            self.core_pkg / "embedded_python-deploy.py",
+        ]
+
+    def _trim_stdlib(self, prefix):
+        """Drop the standard library modules which nothing in the environment imports
+
+        See `scripts/trim_stdlib.py` for the analysis. Modules which are only imported
+        dynamically (e.g. `importlib.import_module(name)`) can't be found that way so they must
+        be listed in `stdlib_keep` (space or comma-separated names or patterns, e.g. `"xml*
+        unittest"`). What was kept and dropped is listed in `reports/stdlib_trim.json`.
+
+        The trimmed `.zip` replaces the original rather than being written in place since it
+        may be a hardlink into the `-core` package (`install_mode=layered`). The later packaging
+        steps run with the trimmed interpreter, so the imports of their scripts and of the runtime
+        finders which are installed after this are kept as well.
+        """
+        script = pathlib.Path(self.source_folder, "scripts/trim_stdlib.py")
+        report = pathlib.Path(self.package_folder, "reports/stdlib_trim.json")
+        report.parent.mkdir(parents=True, exist_ok=True)
+        trimmed = self.stdlib_zip.with_name(f".{self.stdlib_zip.name}.trimmed")
+        if self.settings.os == "Windows":
+            extensions = prefix
+        else:
+            extensions = prefix / f"lib/python{self.ldversion}/lib-dynload"
+
+        keep = re.split(r"[\s,]+", str(self.options.stdlib_keep or "").strip())
+        options = [
+            f'--output "{trimmed}"',
+            f'--report "{report}"',
+            f'--site-packages "{self.site_packages}"',
+            f'--extensions "{extensions}"',
+            *(f'--keep "{name}"' for name in keep if name),
+            *(f'--scan "{script}"' for script in self._tool_scripts()),
+        ]
+        self.run(f'"{self.package_py_exe}" "{script}" {" ".join(options)} "{self.stdlib_zip}"')
+        os.replace(trimmed, self.stdlib_zip)
+
+    def _install_lazy_imports(self, prefix):
+        """Install a meta path finder which loads the `lazy_imports` modules on first use
+
+        See `runtime/_embedded_python_lazy.py`. Like the module index, it's enabled via a `.pth`
+        file which `site` processes (see `_enable_site()`) and the names (space or comma-separated
+        names or patterns) are passed along in that file.
+        """
+        finder = pathlib.Path(self.source_folder, "runtime/_embedded_python_lazy.py")
+        files.copy(self, finder.name, src=finder.parent, dst=self.site_packages)
+        names = " ".join(re.split(r"[\s,]+", str(self.options.lazy_imports).strip()))
+        pth = f'import {finder.stem}; {finder.stem}.install("{names}")\n'
+        (self.site_packages / "embedded_python-lazy.pth").write_text(pth)
+        self._enable_site()
+        if self.options.pyc_invalidation_mode != "no":
+            self._precompile_site_packages(prefix, self.site_packages / finder.name)
+
+    def _make_module_index(self, prefix):
+        """Install a meta path finder which resolves imports from a precomputed index
+
+        See `runtime/_embedded_python_index.py` for the finder and `scripts/make_module_index.py`
+        for the index. The index must describe the final layout, so this runs last, after
+        `trim_stdlib` and `zip_site_packages`. The finder is enabled via a `.pth` file which is
+        processed by `site`, see `_enable_site()`.
+        """
+        finder = pathlib.Path(self.source_folder, "runtime/_embedded_python_index.py")
+        files.copy(self, finder.name, src=finder.parent, dst=self.site_packages)
+        (self.site_packages / "embedded_python-index.pth").write_text(f"import {finder.stem}\n")
+        self._enable_site()
+        if self.options.pyc_invalidation_mode != "no":
+            self._precompile_site_packages(prefix, self.site_packages / finder.name)
+
+        script = pathlib.Path(self.source_folder, "scripts/make_module_index.py")
+        index = self.site_packages / f"{finder.stem}.marshal"
+        options = f'--prefix "{prefix}" --output "{index}"'
+        self.run(f'"{self.package_py_exe}" "{script}" {options}')
+
+    def _make_image(self, prefix):
+        """Pack the whole environment into a single uncompressed `embedded_python.image` file
+
+        The image is a `.zip` with three parts:
+        - `lib/`: the zipped standard library, imported directly from the image by `zipimport`.
+        - `site-packages/`: the contents of `site-packages.zip` (see `zip_site_packages`), also
+          imported directly from the image.
+        - `home/`: everything else in the environment (extension modules, shared libraries, and
+          packages which need to be on disk). It's extracted once into a cache folder named after
+          the content hash of the image, see `embedded_python/image.hpp` in `-core`.
+        The `sys.path` of the environment is written to `home/.embedded_python-image.paths` with
+        each entry marked as either inside of the `image:` or inside of the extracted `home:`.
+
+        Entries are stored, not deflated: `zipimport` then reads them without decompression and
+        the extraction is a plain copy. The archive comment identifies the image by Python version
+        and SHA-256 of its contents. Timestamps are fixed so the hash only depends on the contents.
+        """
+        image = pathlib.Path(self.package_folder, "embedded_python.image")
+        tmp = image.with_suffix(".image.tmp")
+        site_packages_zip = self.site_packages.with_suffix(".zip")
+        in_image = {
+            self.stdlib_zip.relative_to(prefix).as_posix(): "lib",
+            site_packages_zip.relative_to(prefix).as_posix(): "site-packages",
+        }
+        skipped = {
+            self.stdlib_zip,
+            site_packages_zip,
+            self.site_packages / "embedded_python.pth",  # points to `site-packages.zip`
+        }
+        fixed_date = (1980, 1, 1, 0, 0, 0)
+
+        def copy_zip(zf, source, folder):
+            with zipfile.ZipFile(source) as src:
+                for info in src.infolist():
+                    entry = zipfile.ZipInfo(f"{folder}/{info.filename}", fixed_date)
+                    entry.external_attr = info.external_attr
+                    zf.writestr(entry, src.read(info), zipfile.ZIP_STORED)
+
+        paths = []
+        for line in self.pth_file.read_text().splitlines():
+            if line.strip() and not line.startswith(("#", "import ")):
+                paths.append(f"image:{in_image[line]}" if line in in_image else f"home:{line}")
+
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_STORED) as zf:
+            copy_zip(zf, self.stdlib_zip, "lib")
+            if site_packages_zip.exists():
+                copy_zip(zf, site_packages_zip, "site-packages")
+            for path in sorted(prefix.rglob("*")):
+                if path in skipped or (path.is_dir() and not path.is_symlink()):
+                    continue
+                entry = zipfile.ZipInfo(f"home/{path.relative_to(prefix).as_posix()}", fixed_date)
+                if path.is_symlink():
+                    entry.create_system = 3
+                    entry.external_attr = (stat.S_IFLNK | 0o777) << 16
+                    zf.writestr(entry, os.readlink(path))
+                else:
+                    entry.external_attr = (stat.S_IFREG | stat.S_IMODE(path.stat().st_mode)) << 16
+                    zf.writestr(entry, path.read_bytes())
+            paths_entry = zipfile.ZipInfo("home/.embedded_python-image.paths", fixed_date)
+            paths_entry.external_attr = (stat.S_IFREG | 0o644) << 16
+            zf.writestr(paths_entry, "\n".join(paths) + "\n")
+            entry_count = len(zf.infolist())
+
+        # `zipimport` only supports ZIP64 archives since Python 3.13
+        if entry_count > 0xFFFF and self.pyversion < "3.13":
+            tmp.unlink()
+            raise ConanException(
+                f"`image` has {entry_count} entries which requires Python >= 3.13, consider "
+                "`trim_stdlib` or fewer `packages`"
+            )
+
+        h = hashlib.sha256()
+        with open(tmp, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        with zipfile.ZipFile(tmp, "a") as zf:
+            zf.comment = (
+                f"embedded_python-image {self.pyversion}{self.abiflags} {h.hexdigest()}".encode()
+            )
+        os.replace(tmp, image)
+        self.output.info(
+            f"Packed {entry_count} files into {image.name}: {image.stat().st_size} bytes"
+        )
+
+    def _measure_imports(self, modules):
+        """Import `modules` in a fresh interpreter and return `(seconds, imported_module_names)`
+
+        The output of `-X importtime` also includes the modules imported at startup which we
+        measure separately and exclude here. Times are reported in microseconds. The modules
+        are imported together so that shared dependencies are only counted once. Only the
+        outermost imports are added up: if one of `modules` imports another, the inner one is
+        nested in the output and already included in the cumulative time of the outer one.
+        """
+
+        def importtime(code):
+            p = subprocess.run(
+                [str(self.package_py_exe), "-X", "importtime", "-c", code],
+                capture_output=True,
+                text=True,
+            )
+            if p.returncode != 0:
+                raise ConanException(p.stderr.strip().split("\n")[-1])
+            entries, outermost = {}, set()
+            for line in p.stderr.splitlines():
+                if line.startswith("import time:") and "|" in line:
+                    _, cumulative, name = line[len("import time:") :].split("|")
+                    if cumulative.strip().isdigit():
+                        entries[name.strip()] = int(cumulative)
+                        if name == f" {name.strip()}":  # nested imports are indented further
+                            outermost.add(name.strip())
+            return entries, outermost
+
+        startup, _ = importtime("pass")
+        entries, outermost = importtime(f"import {', '.join(modules)}")
+        entries = {k: v for k, v in entries.items() if k not in startup}
+        return sum(v for k, v in entries.items() if k in outermost) / 1e6, list(entries)
+
+    def _report_imports(self, license_folder):
+        """Write the import time and disk footprint of each distribution to `import_report.*`
+
+        For each distribution, we import all of its top-level modules in a fresh interpreter and
+        record the cumulative import time and the number of modules pulled in (including other
+        distributions). The footprint is measured on disk: total size, number of files, and number
+        of native binaries (extension modules and vendored shared libraries).
+
+        If an `import_budget` file is given, the build fails if any distribution exceeds it. It's
+        a JSON file with limits for the numeric fields of the report, e.g.:
+            {"default": {"import_time": 0.5}, "packages": {"numpy": {"import_time": 1.0}}}
+        """
+        native_suffixes = {".so", ".pyd", ".dylib", ".dll"}
+        report = {}
+        for dist_info, records in self._installed_distributions().items():
+            with open(dist_info / "METADATA", encoding="utf-8") as f:
+                metadata = HeaderParser().parse(f)
+
+            inside = [self.site_packages / r for r in records if r.parts[0] != ".."]
+            disk_files = [f for f in inside if f.is_file()]
+            for py_file in [f for f in disk_files if f.suffix == ".py"]:
+                disk_files += py_file.parent.glob(f"__pycache__/{py_file.stem}.*.pyc")
+            disk_files = list(dict.fromkeys(disk_files))
+
+            top_level = sorted(
+                {
+                    r.parts[0].split(".")[0]
+                    for r in records
+                    if r.parts[0] not in ("..", "__pycache__")
+                    and not r.parts[0].endswith((".dist-info", ".data", ".pth"))
+                    and (len(r.parts) > 1 or r.suffix in native_suffixes | {".py"})
+                    and r.parts[0].split(".")[0].isidentifier()
+                }
+            )
+            import_time, imported = 0.0, []
+            if top_level:
+                try:
+                    import_time, imported = self._measure_imports(top_level)
+                except ConanException as e:
+                    self.output.warning(f"Failed to import {top_level}: {e}")
+
+            report[metadata["Name"]] = {
+                "version": metadata["Version"],
+                "modules": top_level,
+                "import_time": import_time,
+                "imported_modules": len(imported),
+                "size": sum(f.stat().st_size for f in disk_files),
+                "files": len(disk_files),
+                "native_files": sum(f.suffix in native_suffixes for f in disk_files),
+            }
+
+        with open(license_folder / "import_report.json", "w") as f:
+            json.dump(report, f, indent=2)
+        with open(license_folder / "import_report.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            keys = ["version", "import_time", "imported_modules", "size", "files", "native_files"]
+            writer.writerow(["name"] + keys + ["modules"])
+            for name, entry in report.items():
+                writer.writerow([name] + [entry[k] for k in keys] + [" ".join(entry["modules"])])
+
+        if self.options.import_budget:
+            self._check_import_budget(report)
+
+    @staticmethod
+    def _validate_import_budget(path):
+        """Only the numeric fields of the import report can have a budget"""
+        numeric_keys = ["import_time", "imported_modules", "size", "files", "native_files"]
+        try:
+            with open(path) as f:
+                budget = json.load(f)
+        except ValueError as e:
+            raise ConanInvalidConfiguration(f"`import_budget`: invalid JSON in {path}: {e}")
+        if not isinstance(budget, dict):
+            raise ConanInvalidConfiguration(f"`import_budget`: expected a JSON object in {path}")
+
+        unknown = set(budget) - {"default", "packages"}
+        limits = {"default": budget.get("default", {})}
+        packages = budget.get("packages", {})
+        if not isinstance(packages, dict):
+            unknown.add("packages")
+        else:
+            limits.update({f"packages.{name}": v for name, v in packages.items()})
+        for where, entry in limits.items():
+            if not isinstance(entry, dict):
+                unknown.add(where)
+                continue
+            for key, limit in entry.items():
+                is_number = isinstance(limit, (int, float)) and not isinstance(limit, bool)
+                if key not in numeric_keys or not is_number:
+                    unknown.add(f"{where}.{key}")
+        if unknown:
+            raise ConanInvalidConfiguration(
+                f"`import_budget`: unsupported entries in {path}: {', '.join(sorted(unknown))}. "
+                f"Budgets are numbers for any of: {', '.join(numeric_keys)}"
+            )
+
+    def _check_import_budget(self, report):
+        """Fail the build if any distribution in `report` exceeds the `import_budget` file"""
+        with open(str(self.options.import_budget)) as f:
+            budget = json.load(f)
+
+        def normalize(name):
+            return re.sub(r"[-_.]+", "-", name).lower()
+
+        default = budget.get("default", {})
+        packages = {normalize(k): v for k, v in budget.get("packages", {}).items()}
+        violations = []
+        for name, entry in report.items():
+            limits = {**default, **packages.get(normalize(name), {})}
+            for key, limit in limits.items():
+                if entry.get(key, 0) > limit:
+                    violations.append(f"{name}: {key} = {entry[key]} exceeds budget of {limit}")
+        if violations:
+            raise ConanException("Import budget exceeded:\n" + "\n".join(violations))
+
+    def _read_license_info(self, metadata_dir):
+        """Return the name, version, license, and license texts of an installed distribution
+
+        The license follows `pip-licenses --from=mixed`: the license classifiers if there are
+        any, otherwise the `License-Expression` or `License` metadata fields. The license texts
+        are the files listed as `License-File` or, for older metadata versions, any files named
+        like `LICENSE`, `LICENCE`, or `COPYING` in the metadata directory.
+        """
+        is_egg = metadata_dir.suffix == ".egg-info"
+        metadata_file = metadata_dir / ("PKG-INFO" if is_egg else "METADATA")
+        with open(metadata_file, encoding="utf-8", errors="replace") as f:
+            metadata = HeaderParser().parse(f)
+
+        classifiers = [
+            c.split(" :: ")[-1]
+            for c in metadata.get_all("Classifier", [])
+            if c.startswith("License :: ")
+        ]
+        license_expression = metadata.get("License-Expression")
+        license_field = metadata.get("License")
+        if classifiers:
+            license_name = "; ".join(classifiers)
+        elif license_expression:
+            license_name = license_expression
+        elif license_field and license_field.strip() not in ("", "UNKNOWN"):
+            license_name = license_field.strip()
+        else:
+            license_name = "UNKNOWN"
+
+        candidates = [
+            path
+            for name in metadata.get_all("License-File", [])
+            for path in (metadata_dir / "licenses" / name, metadata_dir / name)
+        ]
+        candidates += sorted(
+            p for p in metadata_dir.rglob("*") if re.match(r"^(LICEN[CS]E|COPYING)", p.name)
+        )
+        license_files = [p for p in dict.fromkeys(candidates) if p.is_file()]
+        texts = [p.read_text(encoding="utf-8", errors="replace") for p in license_files]
+
+        return {
+            "name": metadata["Name"],
+            "version": metadata["Version"],
+            "license": license_name,
+            "license_expression": license_expression,
+            "license_files": [p.relative_to(metadata_dir).as_posix() for p in license_files],
+            "license_text": texts[0] if texts else "UNKNOWN",
+        }
+
+    def _gather_licenses(self, license_folder):
+        """Gather licenses for all packages directly from their metadata
+
+        `package_licenses.txt` keeps the format of `pip-licenses --format=plain-vertical
+        --with-license-file --no-license-path --with-system --from=mixed` which we used before.
+        `package_licenses.json` contains the same information with all license files per package
+        and `package_licenses.spdx.json` is an SPDX 2.3 document of the environment.
+        """
+        metadata_dirs = [
+            *self.site_packages.glob("*.dist-info"),
+            *self.site_packages.glob("*.egg-info"),
+        ]
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            packages = list(executor.map(self._read_license_info, metadata_dirs))
+        packages.sort(key=lambda p: p["name"].lower())
+
+        lines = []
+        for p in packages:
+            lines += [p["name"], p["version"], p["license"], p["license_text"], ""]
+        with open(license_folder / "package_licenses.txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+
+        with open(license_folder / "package_licenses.json", "w", encoding="utf-8") as f:
+            json.dump(packages, f, indent=2)
+
+        with open(license_folder / "package_licenses.spdx.json", "w", encoding="utf-8") as f:
+            json.dump(self._make_spdx_document(packages), f, indent=2)
+
+    def _make_spdx_document(self, packages):
+        """Create an SPDX 2.3 document (as a JSON-compatible `dict`) for the given packages
+
+        Only the `License-Expression` metadata field is guaranteed to be a valid SPDX expression.
+        For everything else, the declared license is `NOASSERTION` and the license names from the
+        package metadata are kept as a comment.
+        """
+        environment = "\n".join(f"{p['name']}=={p['version']}" for p in packages)
+        namespace = uuid.uuid5(uuid.NAMESPACE_URL, f"{self.url}\n{self.pyversion}\n{environment}")
+        spdx_packages = []
+        for p in packages:
+            spdx_id = re.sub(r"[^A-Za-z0-9.-]", "-", f"{p['name']}-{p['version']}")
+            spdx_packages.append(
+                {
+                    "SPDXID": f"SPDXRef-Package-{spdx_id}",
+                    "name": p["name"],
+                    "versionInfo": p["version"],
+                    "downloadLocation": "NOASSERTION",
+                    "filesAnalyzed": False,
+                    "licenseConcluded": "NOASSERTION",
+                    "licenseDeclared": p["license_expression"] or "NOASSERTION",
+                    "licenseComments": p["license"],
+                    "copyrightText": "NOASSERTION",
+                    "externalRefs": [
+                        {
+                            "referenceCategory": "PACKAGE-MANAGER",
+                            "referenceType": "purl",
+                            "referenceLocator": f"pkg:pypi/{p['name'].lower()}@{p['version']}",
+                        }
+                    ],
+                }
+            )
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return {
+            "spdxVersion": "SPDX-2.3",
+            "dataLicense": "CC0-1.0",
+            "SPDXID": "SPDXRef-DOCUMENT",
+            "name": f"{self.name}-{self.version}-python-{self.pyversion}",
+            "documentNamespace": f"{self.url}/spdx/{namespace}",
+            "creationInfo": {
+                "created": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "creators": [f"Tool: {self.name}-{self.version}"],
+            },
+            "packages": spdx_packages,
+        }
 
     def _gather_packages(self, license_folder):
         """Gather all the required packages into a file for future reference"""
@@ -179,26 +1163,55 @@ class EmbeddedPython(ConanFile):
         if not self.options.packages:
             return
 
-        self._build_bootstrap()
+        self._check_package_list()
+        self._build_wheels()
+
+    def _write_manifest(self, prefix):
+        """List every file with its size and hash for incremental deployment
+
+        This replaces the manifest of `-core` which was copied along with the environment. See
+        `embedded_python-deploy.py` in `-core` and `embedded_python_deploy()` in its CMake tools.
+        """
+        script = self.core_pkg / "embedded_python-deploy.py"
+        output = pathlib.Path(self.package_folder, "embedded_python.manifest")
+        self.run(f'"{self.package_py_exe}" "{script}" manifest "{prefix}" --output "{output}"')
 
     def package(self):
         files.copy(self, "embedded_python.cmake", src=self.build_folder, dst=self.package_folder)
-        files.copy(self, "embedded_python*", src=self.core_pkg, dst=self.package_folder)
+        if self.options.install_mode == "layered":
+            files.copy(self, "embedded_python*.cmake", src=self.core_pkg, dst=self.package_folder)
+            core = self.core_pkg / "embedded_python"
+            self._link_tree(core, pathlib.Path(self.package_folder, "embedded_python"))
+        else:
+            files.copy(self, "embedded_python*", src=self.core_pkg, dst=self.package_folder)
         license_folder = pathlib.Path(self.package_folder, "licenses")
         files.copy(self, "LICENSE.txt", src=self.core_pkg / "licenses", dst=license_folder)
 
-        if not self.options.packages:
-            return
-
-        # Some modules always assume that `setuptools` is installed (e.g. pytest)
-        requirements = self._make_requirements_file(
-            extra_packages=[f"setuptools=={self.options.setuptools_version}"]
-        )
         prefix = pathlib.Path(self.package_folder, "embedded_python")
-        options = f'--no-deps --ignore-installed --no-warn-script-location --prefix "{prefix}"'
-        self._run_bootstrap_py(f"-m pip install {options} -r {requirements}")
-        self._gather_licenses(license_folder)
-        self._gather_packages(license_folder)
+        if self.options.packages:
+            self._install_wheels(prefix)
+            if self.options.get_safe("strip_binaries", "no") != "no":
+                self._strip_site_packages()
+            if self.options.get_safe("dedupe_libraries"):
+                self._dedupe_vendored_libraries()
+            self._gather_licenses(license_folder)
+            self._gather_packages(license_folder)
+        if self.options.trim_stdlib:
+            self._trim_stdlib(prefix)
+        if self.options.packages:
+            if self.options.pyc_invalidation_mode != "no":
+                self._precompile_site_packages(prefix)
+            if self.options.import_report:
+                self._report_imports(license_folder)
+            if self.options.zip_site_packages != "no":
+                self._zip_site_packages(prefix)
+        if self.options.lazy_imports:
+            self._install_lazy_imports(prefix)
+        if self.options.module_index:
+            self._make_module_index(prefix)
+        if self.options.image:
+            self._make_image(prefix)
+        self._write_manifest(prefix)
 
     def package_info(self):
         self.cpp_info.set_property("cmake_build_modules", ["embedded_python.cmake"])
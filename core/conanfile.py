@@ -1,4 +1,7 @@
 import os
+import re
+import json
+import hashlib
 import subprocess
 import sys
 import shutil
@@ -23,17 +26,70 @@ class EmbeddedPythonCore(ConanFile):
     options = {
         "version": ["ANY"],
         "zip_stdlib": ["no", "stored", "deflated"],
+        "optimizations": ["no", "lto", "pgo", "pgo+lto"],
+        "pgo_workload": [None, "ANY"],
+        "strip_binaries": ["no", "yes", "split"],
+        "frozen_modules": [None, "ANY"],
+        "builtin_modules": [None, "ANY"],
+        "free_threaded": [False, True],
+        "allocator": ["default", "mimalloc", "jemalloc"],
+        "perf_profiling": [False, True],
     }
     default_options = {
         "zip_stdlib": "stored",
+        "optimizations": "no",
+        "pgo_workload": None,
+        "strip_binaries": "no",
+        "frozen_modules": None,
+        "builtin_modules": None,
+        "free_threaded": False,
+        "allocator": "default",
+        "perf_profiling": False,
     }
-    exports_sources = "embedded_python*.cmake"
+    exports_sources = (
+        "embedded_python*.cmake",
+        "embedded_python-deploy.py",
+        "embedded_python-strip.py",
+        "scripts/*",
+        "include/*",
+    )
     package_type = "shared-library"
 
     def validate(self):
         minimum_python = "3.11.5"
         if self.pyversion < minimum_python:
             raise ConanInvalidConfiguration(f"Minimum supported Python version is {minimum_python}")
+        if self.options.get_safe("free_threaded") and self.pyversion < "3.13":
+            raise ConanInvalidConfiguration("`free_threaded` requires Python 3.13 or newer")
+        if self.options.get_safe("free_threaded") and self.options.allocator != "default":
+            raise ConanInvalidConfiguration(
+                "`free_threaded` always uses CPython's own `mimalloc`: use `allocator=default`"
+            )
+
+        for name in self._frozen_module_names():
+            if not re.fullmatch(r"[A-Za-z_]\w*(\.[A-Za-z_]\w*)*", name):
+                raise ConanInvalidConfiguration(f"`frozen_modules`: invalid module name: {name}")
+        for name in self._builtin_module_names():
+            if not re.fullmatch(r"[A-Za-z_]\w*", name):
+                raise ConanInvalidConfiguration(f"`builtin_modules`: invalid module name: {name}")
+
+        workload = self.options.get_safe("pgo_workload")
+        if workload:
+            self._parse_pgo_workload(str(workload))
+
+    def validate_build(self):
+        """The `pgo_workload` script is only needed, and must only exist, to build the package"""
+        workload = self.options.get_safe("pgo_workload")
+        if workload:
+            path, digest = self._parse_pgo_workload(str(workload))
+            if not os.path.isfile(path):
+                raise ConanInvalidConfiguration(f"`pgo_workload` script not found: {path}")
+            with open(path, "rb") as f:
+                actual = hashlib.sha256(f.read()).hexdigest()
+            if actual != digest:
+                raise ConanInvalidConfiguration(
+                    f"`pgo_workload`: the SHA-256 of {path} is {actual}, not {digest}"
+                )
 
     def config_options(self):
         """On Windows, we download a binary so these options have no effect"""
@@ -41,12 +97,57 @@ class EmbeddedPythonCore(ConanFile):
             del self.settings.compiler
             del self.settings.build_type
             del self.options.zip_stdlib
+            del self.options.optimizations
+            del self.options.pgo_workload
+            del self.options.strip_binaries
+            del self.options.frozen_modules
+            del self.options.builtin_modules
+            del self.options.free_threaded
+            del self.options.allocator
+            del self.options.perf_profiling
 
     def configure(self):
         """We only use the C compiler so ensure we don't need to rebuild if C++ settings change"""
         if self.settings.os != "Windows":
             del self.settings.compiler.cppstd
             del self.settings.compiler.libcxx
+            if "pgo" not in str(self.options.optimizations):
+                self.options.rm_safe("pgo_workload")
+            # Only the prefixed API is used (`mi_malloc()`, `je_malloc()`, see `_use_allocator()`):
+            # the allocator must not replace `malloc()` for the whole process
+            if self.options.allocator == "mimalloc":
+                self.options["mimalloc"].override = False
+            elif self.options.allocator == "jemalloc":
+                self.options["jemalloc"].prefix = "je_"
+                self.options["jemalloc"].enable_cxx = False
+
+    @staticmethod
+    def _parse_pgo_workload(workload):
+        """Split `pgo_workload` into the path of the script and the SHA-256 of its contents
+
+        The value is written like a pip URL with a hash, `/path/to/workload.py#sha256=<hex>`.
+        """
+        path, _, digest = workload.rpartition("#sha256=")
+        if not path or not re.fullmatch(r"[0-9a-f]{64}", digest):
+            raise ConanInvalidConfiguration(
+                f"`pgo_workload` must be `<absolute path>#sha256=<hex digest>`: {workload}"
+            )
+        if not os.path.isabs(path):
+            raise ConanInvalidConfiguration(
+                f"`pgo_workload` must be an absolute path to a Python script: {path}"
+            )
+        return path, digest
+
+    def package_id(self):
+        """The PGO workload is given as a path, but only the contents of the script matter
+
+        The hash is part of the option value so that consumers which only download the binary
+        don't need the script. `validate_build()` checks that it matches the script.
+        """
+        workload = self.info.options.get_safe("pgo_workload")
+        if workload:
+            _, digest = self._parse_pgo_workload(str(workload))
+            self.info.options.pgo_workload = digest
 
     def requirements(self):
         if self.settings.os == "Windows":
@@ -61,6 +162,10 @@ class EmbeddedPythonCore(ConanFile):
             self.requires("libffi/3.4.8")
             self.requires("libuuid/1.0.3")
             self.requires("mpdecimal/2.5.1")
+        if self.options.allocator == "mimalloc":
+            self.requires("mimalloc/2.1.7")
+        elif self.options.allocator == "jemalloc":
+            self.requires("jemalloc/5.3.0")
 
     @property
     def pyversion(self):
@@ -77,10 +182,125 @@ class EmbeddedPythonCore(ConanFile):
         """The first two components of the version number in integer form, e.g. 311"""
         return scm.Version("".join(str(self.options.version).split(".")[:2]))
 
+    @property
+    def abiflags(self):
+        """`t` for the free-threaded build (`free_threaded=True`), otherwise empty"""
+        return "t" if self.options.get_safe("free_threaded") else ""
+
+    @property
+    def ldversion(self):
+        """Version and ABI flags as used in file and folder names, e.g. 3.13t or 3.13"""
+        return f"{self.short_pyversion}{self.abiflags}"
+
+    def _frozen_module_names(self):
+        """`frozen_modules` is a space or comma-separated list of stdlib modules or packages"""
+        names = str(self.options.get_safe("frozen_modules") or "").strip()
+        return [name for name in re.split(r"[\s,]+", names) if name]
+
+    def _freeze_modules(self):
+        """Freeze the `frozen_modules` into `libpython`, in addition to CPython's own selection
+
+        Frozen modules are compiled into the data section of `libpython` so importing them
+        doesn't touch the filesystem or the `.zip`: no path search, no `stat()`, no reading and
+        unmarshalling of a `.pyc` (with deep-freezing in Python 3.11 and 3.12, not even that).
+
+        CPython generates the build rules (`Makefile.pre.in`) and the table of frozen modules
+        (`Python/frozen.c`) from the `FROZEN` list in `freeze_modules.py`. We add a section with
+        the requested modules and re-run the script before `configure`. Packages are frozen with
+        all of their submodules. Modules which CPython already freezes are skipped.
+        """
+        script = pathlib.Path("Tools/build/freeze_modules.py")
+        if not script.exists():
+            script = pathlib.Path("Tools/scripts/freeze_modules.py")  # Python 3.11
+        frozen_by_default = script.read_text()
+
+        specs = []
+        for name in self._frozen_module_names():
+            if re.search(rf"^\s*'<?{re.escape(name)}(\.\*)?>?'", frozen_by_default, re.M):
+                self.output.info(f"`{name}` is already frozen by default")
+            elif pathlib.Path("Lib", *name.split(".")).is_dir():
+                specs.append(f"<{name}.**.*>")
+            elif pathlib.Path("Lib", *name.split(".")).with_suffix(".py").is_file():
+                specs.append(name)
+            else:
+                raise ConanInvalidConfiguration(f"`frozen_modules`: no stdlib module `{name}`")
+
+        section = f"    ('embedded_python: frozen_modules option', {specs!r}),\n"
+        files.replace_in_file(self, script, "FROZEN = [\n", f"FROZEN = [\n{section}")
+        self.run(f'"{sys.executable}" {script}')
+
+    def _builtin_module_names(self):
+        """`builtin_modules` is a space or comma-separated list of stdlib extension modules"""
+        names = str(self.options.get_safe("builtin_modules") or "").strip()
+        return [name for name in re.split(r"[\s,]+", names) if name]
+
+    def _build_in_modules(self):
+        """Link the `builtin_modules` into `libpython` instead of building them in `lib-dynload`
+
+        Importing a shared extension module means searching `sys.path`, `dlopen()`, and symbol
+        relocation. Built-in modules are initialized straight from `libpython`'s table of
+        modules (`sys.builtin_module_names`).
+
+        The build rules of all extension modules are generated by `Modules/makesetup` from the
+        `Setup*` files in which the first rule for a module wins and `Setup.local` comes first.
+        We copy the rules of the requested modules from `Setup.stdlib.in` into a `*static*`
+        section of `Setup.local`: the compiler and linker flags are still found by `configure`
+        (`MODULE_<NAME>_CFLAGS/LDFLAGS`), so the dependencies, e.g. OpenSSL for `_ssl`, are now
+        linked into `libpython`. All other extension modules stay in `lib-dynload`.
+        """
+        setup_stdlib = pathlib.Path("Modules/Setup.stdlib.in").read_text()
+        setup_bootstrap = pathlib.Path("Modules/Setup.bootstrap.in").read_text()
+        rules = []
+        for name in self._builtin_module_names():
+            match = re.search(
+                rf"^(?:@MODULE_\w+_TRUE@)?({re.escape(name)}\s.*)$", setup_stdlib, re.M
+            )
+            if match:
+                rules.append(match.group(1).strip())
+            elif re.search(rf"^(?:@MODULE_\w+_TRUE@)?{re.escape(name)}\s", setup_bootstrap, re.M):
+                self.output.info(f"`{name}` is already built in by default")
+            else:
+                raise ConanInvalidConfiguration(
+                    f"`builtin_modules`: `{name}` is not an extension module which can be built in "
+                    f"with Python {self.pyversion} (e.g. Python 3.11 still builds `_ctypes` via "
+                    "`setup.py`)"
+                )
+
+        with open("Modules/Setup.local", "a") as f:
+            f.write("\n# embedded_python: builtin_modules option\n*static*\n")
+            f.write("".join(f"{rule}\n" for rule in rules))
+
+    def _use_allocator(self):
+        """Route all of CPython's heap allocations to the `allocator` of choice
+
+        CPython's memory domains (raw, mem, and object) all end up in `_PyMem_RawMalloc()` and
+        friends in `Objects/obmalloc.c` when it's built `--without-pymalloc`. Those call the C
+        library's `malloc()`, `calloc()`, `realloc()`, and `free()` which we replace with the
+        prefixed API of the allocator (statically linked into `libpython`). Overriding `malloc()`
+        for the whole process instead would also change the allocator of the host application
+        and break memory that was allocated before `libpython` was loaded. CPython never mixes
+        the C library and `PyMem_Raw*()` functions for the same memory (`PYTHONMALLOC=debug`
+        checks this) so the redirection is safe.
+        """
+        header, prefix = {
+            "mimalloc": ("mimalloc.h", "mi_"),
+            "jemalloc": ("jemalloc/jemalloc.h", "je_"),
+        }[str(self.options.allocator)]
+        path = pathlib.Path("Objects/obmalloc.c")
+        # Calls only: not struct members like `_PyMem.free(...)` or `allocator->free(...)`
+        source = re.sub(
+            r"(?<![\w.>])(malloc|calloc|realloc|free)\(", rf"{prefix}\1(", path.read_text()
+        )
+        path.write_text(source)
+        files.replace_in_file(
+            self, path, '#include "Python.h"\n', f'#include "Python.h"\n#include <{header}>\n'
+        )
+
     def generate(self):
         files.replace_in_file(
             self, "embedded_python-core.cmake", "${self.pyversion}", str(self.pyversion)
         )
+        files.replace_in_file(self, "embedded_python-core.cmake", "${self.abiflags}", self.abiflags)
         if self.settings.os == "Windows":
             return
 
@@ -90,6 +310,12 @@ class EmbeddedPythonCore(ConanFile):
         # here instead of in `def source()` which is reused between Conan options.
         url = f"https://github.com/python/cpython/archive/v{self.pyversion}.tar.gz"
         files.get(self, url, strip_root=True)
+        if self.options.frozen_modules:
+            self._freeze_modules()
+        if self.options.builtin_modules:
+            self._build_in_modules()
+        if self.options.allocator != "default":
+            self._use_allocator()
 
         prefix = pathlib.Path(self.package_folder, "embedded_python")
         tc = AutotoolsToolchain(self, prefix=prefix)
@@ -101,6 +327,31 @@ class EmbeddedPythonCore(ConanFile):
             "--disable-test-modules",
             f"--with-openssl={openssl_path}",
         ]
+        # PGO runs a training workload with an instrumented interpreter and then rebuilds it using
+        # the recorded profile. LTO lets the linker optimize across all of libpython's objects.
+        optimizations = str(self.options.optimizations)
+        if "pgo" in optimizations:
+            tc.configure_args.append("--enable-optimizations")
+        if "lto" in optimizations:
+            tc.configure_args.append("--with-lto")
+        # The free-threaded build (PEP 703) has no GIL and a separate ABI: `cp313t` wheels,
+        # `libpython3.13t`, `lib/python3.13t`, etc. See `ldversion`.
+        if self.options.free_threaded:
+            tc.configure_args.append("--disable-gil")
+        if self.options.allocator != "default":
+            tc.configure_args.append("--without-pymalloc")
+            if self.pyversion >= "3.13":
+                # CPython's bundled copy would clash with the `mi_*` symbols of the allocator and
+                # it's not used anyway unless requested via `PYTHONMALLOC=mimalloc`
+                tc.configure_args.append("--without-mimalloc")
+        # Frame pointers give `perf`, eBPF tools, and other profilers reliable native stacks
+        # through `libpython` without DWARF unwinding. The perf trampoline (Linux only, Python
+        # 3.12+) makes Python frames visible in those stacks at runtime via `-X perf` or
+        # `PyConfig.perf_profiling`, see `embedded_python/perf.hpp`.
+        if self.options.perf_profiling:
+            tc.extra_cflags += ["-fno-omit-frame-pointer", "-mno-omit-leaf-frame-pointer"]
+            if self.settings.os == "Linux" and self.pyversion >= "3.12":
+                tc.configure_args.append("--enable-perf-trampoline")
         tc.generate()
 
         deps = AutotoolsDeps(self)
@@ -141,14 +392,28 @@ class EmbeddedPythonCore(ConanFile):
 
         autotools = Autotools(self)
         autotools.configure()
-        autotools.make()
+        autotools.make(args=self._profile_task_args())
+
+    def _profile_task_args(self):
+        """Replace CPython's default PGO training run with a user-provided workload script
+
+        By default, `--enable-optimizations` trains on a subset of CPython's own test suite (the
+        `PROFILE_TASK` make variable). A workload which is representative of the application
+        gives a better profile. The variable is expanded in a shell command so we need to keep
+        the path quoted all the way through.
+        """
+        workload = self.options.get_safe("pgo_workload")
+        if not workload:
+            return None
+        path, _ = self._parse_pgo_workload(str(workload))
+        return [f"PROFILE_TASK=\"'{path}'\""]
 
     def _patch_libpython_path(self, dst):
         """Patch libpython search path on macOS"""
         if self.settings.os != "Macos":
             return
 
-        exe = dst / f"python{self.short_pyversion}"
+        exe = dst / f"python{self.ldversion}"
         p = subprocess.run(["otool", "-L", str(exe)], check=True, text=True, capture_output=True)
         lines = str(p.stdout).strip().split("\n")[1:]
         libraries = [line.split()[0] for line in lines]
@@ -158,6 +423,21 @@ class EmbeddedPythonCore(ConanFile):
             self.output.info(f"Patching {exe}, replace {lib} with {relocatable_library}")
             self.run(f"install_name_tool -change {lib} {relocatable_library} {exe}")
 
+    def _strip_binaries(self, prefix):
+        """Strip the symbols from all binaries: the executable, `libpython`, and `lib-dynload`
+
+        See `embedded_python-strip.py` which is shared with `embedded_python`. With
+        `strip_binaries=split`, the debug info is kept in `debug/embedded_python-core.debug.tar.xz`
+        in the package (not part of the `embedded_python` folder which gets deployed) so that
+        crashes can still be symbolized.
+        """
+        script = pathlib.Path(self.package_folder, "embedded_python-strip.py")
+        options = ""
+        if self.options.strip_binaries == "split":
+            archive = pathlib.Path(self.package_folder, "debug/embedded_python-core.debug.tar.xz")
+            options = f' --split "{archive}"'
+        self.run(f'"{sys.executable}" "{script}" "{prefix}"{options}')
+
     def _zip_stdlib(self, prefix):
         """Precompile and zip the standard library just like the pre-built package for Windows
 
@@ -174,7 +454,7 @@ class EmbeddedPythonCore(ConanFile):
         keep_lib_dirs = [
             "lib-dynload",  # contains only binaries (shared libraries)
             "site-packages",  # not part of the standard library
-            f"config-{self.short_pyversion}-{sys.platform}",  # binaries and config files
+            f"config-{self.ldversion}-{sys.platform}",  # binaries and config files
         ]
 
         # Pre compile all the `.py` files into `.pyc` byte code
@@ -201,11 +481,11 @@ class EmbeddedPythonCore(ConanFile):
             # Use as many compiler workers as there are CPU threads.
             "-j0",
         ]
-        lib = prefix / f"lib/python{self.short_pyversion}"
+        lib = prefix / f"lib/python{self.ldversion}"
         self.run(f"{compileall} {' '.join(options)} {lib}")
 
         # Zip all the `.pyc` files
-        zip_name = prefix / f"lib/python{self.int_pyversion}.zip"
+        zip_name = prefix / f"lib/python{self.int_pyversion}{self.abiflags}.zip"
         compression = getattr(zipfile, f"ZIP_{str(self.options.zip_stdlib).upper()}")
         with zipfile.ZipFile(zip_name, "w", compression) as zf:
             for root, dir_names, file_names in os.walk(lib):
@@ -222,6 +502,28 @@ class EmbeddedPythonCore(ConanFile):
             elif path.is_dir() and path.name not in keep_lib_dirs:
                 shutil.rmtree(path)
 
+    def _report_throughput(self, prefix):
+        """Run a small set of CPU-bound benchmarks and ship the results with the package
+
+        The report makes it possible to compare the effect of the `optimizations` option: the
+        results of a package built with `optimizations=no` are the baseline for the others. The
+        same goes for the overhead of the frame pointers of `perf_profiling`.
+        """
+        report_folder = pathlib.Path(self.package_folder, "reports")
+        report_folder.mkdir(parents=True, exist_ok=True)
+        output = report_folder / "throughput.json"
+        script = pathlib.Path(self.source_folder, "scripts/throughput.py")
+        py_exe = prefix / ("python.exe" if self.settings.os == "Windows" else "bin/python3")
+        self.run(f'"{py_exe}" "{script}" --output "{output}"')
+
+        with open(output) as f:
+            report = json.load(f)
+        report["optimizations"] = str(self.options.get_safe("optimizations", "no"))
+        report["allocator"] = str(self.options.get_safe("allocator", "default"))
+        report["perf_profiling"] = bool(self.options.get_safe("perf_profiling", False))
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+
     def _isolate(self, prefix):
         """Isolate this embedded environment from any other Python installations
 
@@ -260,25 +562,47 @@ class EmbeddedPythonCore(ConanFile):
                 f.write("\n".join(paths))
         else:
             paths = [
-                f"lib/python{self.int_pyversion}.zip",
-                f"lib/python{self.short_pyversion}",
-                f"lib/python{self.short_pyversion}/lib-dynload",
-                f"lib/python{self.short_pyversion}/site-packages",
+                f"lib/python{self.int_pyversion}{self.abiflags}.zip",
+                f"lib/python{self.ldversion}",
+                f"lib/python{self.ldversion}/lib-dynload",
+                f"lib/python{self.ldversion}/site-packages",
             ]
             # `.pth` file must be next to real (non-symlink) executable and use the same name.
-            with open(prefix / f"python{self.short_pyversion}._pth", "w") as f:
+            py_exe = f"python{self.ldversion}"
+            with open(prefix / f"{py_exe}._pth", "w") as f:
                 f.write("\n".join(paths))
 
+            # The free-threaded build installs `python3.13t` plus a hardlink named `python3.13`
+            # which `python3` points to. A hardlink is a real executable so it would need its own
+            # `._pth` file: turn it into a symlink instead.
+            if self.abiflags:
+                for name in [f"python{self.short_pyversion}", "python3"]:
+                    (prefix / name).unlink(missing_ok=True)
+                    os.symlink(py_exe, prefix / name)
+
             bin_dir = prefix / "bin"
             bin_dir.mkdir(parents=True, exist_ok=True)
-            py_exe = f"python{self.short_pyversion}"
             os.symlink(f"../{py_exe}", bin_dir / py_exe)
+            if self.abiflags:
+                os.symlink(f"../{py_exe}", bin_dir / f"python{self.short_pyversion}")
             os.symlink(f"../{py_exe}", bin_dir / "python3")
 
+    def _write_manifest(self, prefix):
+        """List every file with its size and hash for incremental deployment
+
+        See `embedded_python-deploy.py` and `embedded_python_deploy()` in the CMake tools.
+        """
+        script = pathlib.Path(self.package_folder, "embedded_python-deploy.py")
+        output = pathlib.Path(self.package_folder, "embedded_python.manifest")
+        py_exe = prefix / ("python.exe" if self.settings.os == "Windows" else "bin/python3")
+        self.run(f'"{py_exe}" "{script}" manifest "{prefix}" --output "{output}"')
+
     def package(self):
         src = self.build_folder
         dst = pathlib.Path(self.package_folder, "embedded_python")
         files.copy(self, "embedded_python*.cmake", src, dst=self.package_folder)
+        files.copy(self, "embedded_python-*.py", src, dst=self.package_folder)
+        files.copy(self, "include/*", src, dst=self.package_folder)
         license_folder = pathlib.Path(self.package_folder, "licenses")
 
         if self.settings.os == "Windows":
@@ -295,6 +619,7 @@ class EmbeddedPythonCore(ConanFile):
 
             self._isolate(dst)
             files.copy(self, "LICENSE.txt", src=dst, dst=license_folder)
+            self._report_throughput(dst)
         else:
             from conan.tools.gnu import Autotools
 
@@ -302,6 +627,8 @@ class EmbeddedPythonCore(ConanFile):
             autotools.install(args=["DESTDIR=''"])  # already handled by AutotoolsToolchain prefix
             self._patch_libpython_path(dst)
             self._isolate(dst)
+            if self.options.strip_binaries != "no":
+                self._strip_binaries(dst)
 
             # Give write permissions, otherwise end-user projects won't be able to re-import
             # the shared libraries (re-import happens on subsequent `conan install` runs).
@@ -310,7 +637,7 @@ class EmbeddedPythonCore(ConanFile):
 
             files.copy(
                 self,
-                f"lib/python{self.short_pyversion}/LICENSE.txt",
+                f"lib/python{self.ldversion}/LICENSE.txt",
                 src=dst,
                 dst=license_folder,
                 keep_path=False,
@@ -319,12 +646,22 @@ class EmbeddedPythonCore(ConanFile):
             if self.options.zip_stdlib != "no":
                 self._zip_stdlib(dst)
 
+            self._report_throughput(dst)
+
+        self._write_manifest(dst)
+
     def package_info(self):
         self.cpp_info.set_property(
-            "cmake_build_modules", ["embedded_python-core.cmake", "embedded_python-tools.cmake"]
+            "cmake_build_modules",
+            [
+                "embedded_python-core.cmake",
+                "embedded_python-tools.cmake",
+                "embedded_python-embedding.cmake",
+            ],
         )
         prefix = pathlib.Path(self.package_folder) / "embedded_python"
-        self.cpp_info.includedirs = [str(prefix / "include")]
+        # Python's headers and the C++ helpers for embedding (`embedded_python/*.hpp`)
+        self.cpp_info.includedirs = [str(prefix / "include"), str(prefix.parent / "include")]
         if self.settings.os == "Windows":
             self.cpp_info.bindirs = [str(prefix)]
         else:
@@ -13,4 +13,13 @@ else()
     set(Python_EXECUTABLE "${Python_ROOT_DIR}/python3" CACHE STRING "" FORCE)
 endif()
 
+# The free-threaded build (`embedded_python-core/*:free_threaded=True`) has the `t` ABI which
+# `find_package(Python)` only accepts when it's explicitly requested (since CMake 3.30).
+if("${self.abiflags}" STREQUAL "t")
+    if(CMAKE_VERSION VERSION_LESS 3.30)
+        message(FATAL_ERROR "The free-threaded embedded Python requires CMake >= 3.30")
+    endif()
+    set(Python_FIND_ABI "ANY" "ANY" "ANY" "ON")
+endif()
+
 find_package(Python ${self.pyversion} EXACT REQUIRED GLOBAL COMPONENTS Interpreter Development)
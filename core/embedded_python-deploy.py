@@ -0,0 +1,207 @@
+"""Deploy an embedded Python environment incrementally, based on its content manifest
+
+The packages `embedded_python-core` and `embedded_python` both ship `embedded_python.manifest`
+next to their `embedded_python` folder. It's written at package time by the `manifest` command
+and lists the path, size, and SHA-256 of every file (and the target of every symlink).
+
+The `deploy` command copies an environment to a destination folder, e.g. next to the
+application executable. It records what it deployed in `.embedded_python.deployed` in the
+destination: the hash from the manifest plus the size and modification time of the copy. On the
+next run, only files whose hash changed in the manifest are copied and files which are no longer
+part of the environment are removed. Files which are unchanged in the manifest are skipped
+without reading them as long as their size and modification time still match the record.
+Otherwise, or with `--verify`, the deployed file is hashed and replaced if it doesn't match.
+Files in the destination which were not deployed by this script are never touched.
+
+This script only uses the standard library so that it can run with the embedded Python itself.
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+import concurrent.futures
+
+MANIFEST_VERSION = 1
+STATE_FILE = ".embedded_python.deployed"
+
+
+def sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def scan(root):
+    """Return `({path: size}, {path: symlink_target})` with `/`-separated relative paths"""
+    files, symlinks = {}, {}
+    for directory, dir_names, file_names in os.walk(root):
+        for name in dir_names + file_names:
+            path = os.path.join(directory, name)
+            relative_path = os.path.relpath(path, root).replace(os.sep, "/")
+            if os.path.islink(path):
+                symlinks[relative_path] = os.readlink(path)
+            elif name in file_names:
+                files[relative_path] = os.path.getsize(path)
+        dir_names[:] = [d for d in dir_names if not os.path.islink(os.path.join(directory, d))]
+    return files, symlinks
+
+
+def make_manifest(root):
+    files, symlinks = scan(root)
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        hashes = executor.map(lambda path: sha256(os.path.join(root, path)), files)
+        entries = {
+            path: {"size": size, "sha256": digest}
+            for (path, size), digest in zip(files.items(), hashes)
+        }
+    return {
+        "version": MANIFEST_VERSION,
+        "files": dict(sorted(entries.items())),
+        "symlinks": dict(sorted(symlinks.items())),
+    }
+
+
+def write_json(data, path):
+    """Write to a temporary file first so that an interrupted run never leaves a partial file"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp, path)
+
+
+def read_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def read_manifest(root):
+    path = os.path.join(os.path.dirname(os.path.abspath(root)), "embedded_python.manifest")
+    manifest = read_json(path, None)
+    if manifest is None:
+        print(f"No manifest at {path}: hashing the environment instead")
+        return make_manifest(root)
+    if manifest.get("version") != MANIFEST_VERSION:
+        sys.exit(f"Unsupported manifest version {manifest.get('version')}: {path}")
+    return manifest
+
+
+def stat_record(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def is_intact(path, expected, record, verify):
+    """Does the deployed file at `path` still have the `expected` content?"""
+    try:
+        stat = stat_record(path)
+    except OSError:
+        return False
+    if stat["size"] != expected["size"]:
+        return False
+    if not verify and record and {k: record.get(k) for k in stat} == stat:
+        return True
+    return sha256(path) == expected["sha256"]
+
+
+def copy(source, destination):
+    """Copy via a temporary file: the destination may be a hardlink which must not be modified"""
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    tmp = os.path.join(os.path.dirname(destination), f".{os.path.basename(destination)}.tmp")
+    shutil.copy2(source, tmp)
+    os.replace(tmp, destination)
+
+
+def remove(path, destination):
+    """Remove a deployed file and the folders which are empty afterwards (within `destination`)"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return
+    directory = os.path.dirname(path)
+    while directory != destination and directory.startswith(destination):
+        try:
+            os.rmdir(directory)  # only succeeds for empty folders
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+
+def deploy(root, destination, verify):
+    manifest = read_manifest(root)
+    os.makedirs(destination, exist_ok=True)
+    state_path = os.path.join(destination, STATE_FILE)
+    state = read_json(state_path, {"files": {}, "symlinks": {}})
+    old_files, old_symlinks = state.get("files", {}), state.get("symlinks", {})
+    new_files, new_symlinks = manifest["files"], manifest["symlinks"]
+
+    # Remove first: a stale symlink may be in the way of a new file (or a folder of new files)
+    stale = [
+        p for p in {**old_files, **old_symlinks} if p not in new_files and p not in new_symlinks
+    ]
+    for path in stale:
+        remove(os.path.join(destination, path), destination)
+
+    def deploy_file(path):
+        expected = new_files[path]
+        target = os.path.join(destination, path)
+        if os.path.islink(target):
+            os.remove(target)  # was a symlink before, don't check or write through it
+        record = old_files.get(path)
+        if record and record.get("sha256") == expected["sha256"]:
+            if is_intact(target, expected, record, verify):
+                return path, {**expected, **stat_record(target)}, False
+        elif not record and is_intact(target, expected, None, verify=True):
+            return path, {**expected, **stat_record(target)}, False  # e.g. after a lost state
+        copy(os.path.join(root, path), target)
+        return path, {**expected, **stat_record(target)}, True
+
+    deployed, copied = {}, 0
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        for path, record, was_copied in executor.map(deploy_file, new_files):
+            deployed[path] = record
+            copied += was_copied
+
+    for path, link_target in new_symlinks.items():
+        target = os.path.join(destination, path)
+        if os.path.islink(target) and os.readlink(target) == link_target:
+            continue
+        if os.path.lexists(target):
+            os.remove(target)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.symlink(link_target, target)
+
+    write_json({"files": deployed, "symlinks": new_symlinks}, state_path)
+    print(
+        f"Deployed Python to {destination}: {copied} copied, {len(stale)} removed, "
+        f"{len(new_files) - copied} up to date"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    manifest = commands.add_parser("manifest", help="write the manifest of an environment")
+    manifest.add_argument("root", help="the `embedded_python` folder")
+    manifest.add_argument("--output", required=True, help="path of the manifest")
+    deployment = commands.add_parser("deploy", help="copy an environment incrementally")
+    deployment.add_argument("root", help="the `embedded_python` folder of the package")
+    deployment.add_argument("destination", help="where to deploy the environment")
+    deployment.add_argument("--verify", action="store_true", help="rehash all deployed files")
+    args = parser.parse_args()
+
+    if args.command == "manifest":
+        write_json(make_manifest(args.root), args.output)
+    else:
+        deploy(os.path.abspath(args.root), os.path.abspath(args.destination), args.verify)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+include_guard(GLOBAL)
+
+# C++ helpers for applications which embed Python, see `include/embedded_python/*.hpp`. They are
+# header-only so the target only adds the include path and usage requirements on top of Python.
+find_package(Threads REQUIRED)
+add_library(EmbeddedPython::Embedding INTERFACE IMPORTED GLOBAL)
+target_include_directories(EmbeddedPython::Embedding INTERFACE "${CMAKE_CURRENT_LIST_DIR}/include")
+target_link_libraries(EmbeddedPython::Embedding INTERFACE Python::Python Threads::Threads)
+target_compile_features(EmbeddedPython::Embedding INTERFACE cxx_std_17)
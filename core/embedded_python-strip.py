@@ -0,0 +1,138 @@
+"""Strip the symbols from all ELF and Mach-O binaries in a folder
+
+This is shared by the `strip_binaries` option of `embedded_python-core` (the interpreter,
+`libpython`, and `lib-dynload`) and of `embedded_python` (the extension modules and shared
+libraries in `site-packages`). Smaller binaries are faster to deploy and to load.
+
+With `--split`, the debug info of each binary is saved before stripping and packed into the
+given `.tar.xz` archive so that crashes can still be symbolized: extract it and point the
+debugger's debug file directory at it. On Linux, the archive uses the `.build-id/xx/yyyy.debug`
+layout that `gdb`, `lldb`, `perf`, etc. search. On macOS, it contains `.dSYM` bundles which are
+matched by their UUID.
+
+Each stripped binary is written to a temporary file which then replaces the original: the
+original may be a hardlink into a cache which must not be modified. Binaries which can't be
+processed (e.g. some wheels ship unusual ones) are left as is with a warning.
+
+This script only uses the standard library. It runs with the Python that runs Conan rather than
+the embedded one, since it rewrites the binaries of the embedded interpreter.
+"""
+
+import os
+import re
+import sys
+import shutil
+import tarfile
+import argparse
+import tempfile
+import subprocess
+import concurrent.futures
+
+MACOS = sys.platform == "darwin"
+
+
+def is_binary(path):
+    """Is `path` an ELF or Mach-O executable or shared library (not an object file)?"""
+    with open(path, "rb") as f:
+        header = f.read(18)
+    if len(header) < 18:
+        return False
+    if header[:4] == b"\x7fELF":
+        byteorder = "little" if header[5] == 1 else "big"
+        return int.from_bytes(header[16:18], byteorder) in (2, 3)  # ET_EXEC, ET_DYN
+    if header[:4] in (b"\xce\xfa\xed\xfe", b"\xcf\xfa\xed\xfe"):
+        return int.from_bytes(header[12:16], "little") in (2, 6, 8)  # executable, dylib, bundle
+    if MACOS and header[:4] == b"\xca\xfe\xba\xbe":
+        # A universal binary, or a Java `.class` file with the same magic. The class file
+        # version which follows is at least 45, but a universal binary has only a few archs.
+        return 0 < int.from_bytes(header[4:8], "big") < 20
+    return False
+
+
+def debug_file(file, root, debug_root):
+    """Where the debug info of `file` is saved: by build ID if possible, else by path"""
+    relative_path = os.path.relpath(file, root)
+    if MACOS:
+        return os.path.join(debug_root, f"{relative_path}.dSYM")
+
+    p = subprocess.run(["readelf", "-n", file], check=True, capture_output=True, text=True)
+    match = re.search(r"Build ID: ([0-9a-f]{3,})", p.stdout)
+    if match:
+        build_id = match.group(1)
+        return os.path.join(debug_root, ".build-id", build_id[:2], f"{build_id[2:]}.debug")
+    return os.path.join(debug_root, f"{relative_path}.debug")
+
+
+def strip(file, debug_file):
+    """Strip `file`, optionally splitting its debug info into `debug_file` first"""
+    tmp = os.path.join(os.path.dirname(file), f".{os.path.basename(file)}.stripped")
+    if MACOS:
+        commands = [["dsymutil", file, "-o", debug_file]] if debug_file else []
+        commands += [
+            ["strip", "-x", "-o", tmp, file],
+            # Stripping invalidates the ad-hoc signature which is mandatory on Apple silicon
+            ["codesign", "--force", "--sign", "-", tmp],
+        ]
+    elif debug_file:
+        commands = [
+            ["objcopy", "--only-keep-debug", file, debug_file],
+            ["objcopy", "--strip-unneeded", f"--add-gnu-debuglink={debug_file}", file, tmp],
+        ]
+    else:
+        commands = [["strip", "--strip-unneeded", "-o", tmp, file]]
+
+    if debug_file:
+        os.makedirs(os.path.dirname(debug_file), exist_ok=True)
+    try:
+        for command in commands:
+            subprocess.run(command, check=True, capture_output=True, text=True)
+        shutil.copymode(file, tmp)
+        os.replace(tmp, file)
+    finally:
+        if os.path.lexists(tmp):
+            os.remove(tmp)
+
+
+def find_binaries(root):
+    binaries = []
+    for directory, _, file_names in os.walk(root):
+        for name in file_names:
+            path = os.path.join(directory, name)
+            if not os.path.islink(path) and is_binary(path):
+                binaries.append(path)
+    return sorted(binaries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", help="the folder to strip the binaries of")
+    parser.add_argument("--split", metavar="ARCHIVE", help="save the debug info to this `.tar.xz`")
+    args = parser.parse_args()
+
+    binaries = find_binaries(args.root)
+    size_before = sum(os.path.getsize(file) for file in binaries)
+
+    with tempfile.TemporaryDirectory() as debug_root:
+
+        def task(file):
+            try:
+                debug = debug_file(file, args.root, debug_root) if args.split else None
+                strip(file, debug)
+            except subprocess.CalledProcessError as e:
+                print(f"WARN: Failed to strip {file}: {e.stderr.strip()}", file=sys.stderr)
+
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            list(executor.map(task, binaries))
+
+        if args.split and os.listdir(debug_root):
+            os.makedirs(os.path.dirname(os.path.abspath(args.split)), exist_ok=True)
+            with tarfile.open(args.split, "w:xz") as tf:
+                for name in sorted(os.listdir(debug_root)):
+                    tf.add(os.path.join(debug_root, name), arcname=name)
+
+    size_after = sum(os.path.getsize(file) for file in binaries)
+    print(f"Stripped {len(binaries)} binaries: {size_before} -> {size_after} bytes")
+
+
+if __name__ == "__main__":
+    main()
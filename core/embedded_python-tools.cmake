@@ -4,7 +4,7 @@ include_guard(DIRECTORY)
 # build tree every time we re-configure the project. Instead, we can point `PyConfig::home`
 # to the contents of this file to gain access to all the Python packages.
 # For release/deployment, the entire `Python_ROOT_DIR` should be copied into the app's `bin`
-# folder and `PyConfig::home` should point to that.
+# folder and `PyConfig::home` should point to that: see `embedded_python_deploy()` below.
 function(embedded_python_generate_home_file filename content)
     if(DEFINED CMAKE_RUNTIME_OUTPUT_DIRECTORY)
         set(filename ${CMAKE_RUNTIME_OUTPUT_DIRECTORY}/${filename})
@@ -13,3 +13,40 @@ function(embedded_python_generate_home_file filename content)
 endfunction()
 
 embedded_python_generate_home_file(".embedded_python-core.home" "${Python_ROOT_DIR}")
+
+# Deploy the Python environment next to the executable of `target` after it's built:
+#
+#     embedded_python_deploy(<target> [DESTINATION <dir>] [ROOT <dir>] [VERIFY])
+#
+# `ROOT` is the environment to deploy: `EmbeddedPython_ROOT_DIR` (with `pip` packages) if it's
+# available, otherwise `Python_ROOT_DIR` (`-core`). `DESTINATION` defaults to `python` in the
+# target's output folder. The deployment is incremental: based on the manifest generated at package
+# time, only changed files are copied and files which are no longer part of the environment are
+# removed. Unchanged files are checked by size and modification time and only hashed with `VERIFY`.
+# See `embedded_python-deploy.py` for details.
+set(_embedded_python_deploy_script "${CMAKE_CURRENT_LIST_DIR}/embedded_python-deploy.py"
+    CACHE INTERNAL "")
+function(embedded_python_deploy target)
+    cmake_parse_arguments(PARSE_ARGV 1 arg "VERIFY" "DESTINATION;ROOT" "")
+    if(NOT arg_ROOT)
+        if(DEFINED EmbeddedPython_ROOT_DIR)
+            set(arg_ROOT "${EmbeddedPython_ROOT_DIR}")
+        else()
+            set(arg_ROOT "${Python_ROOT_DIR}")
+        endif()
+    endif()
+    if(NOT arg_DESTINATION)
+        set(arg_DESTINATION "$<TARGET_FILE_DIR:${target}>/python")
+    endif()
+    set(verify "")
+    if(arg_VERIFY)
+        set(verify "--verify")
+    endif()
+    add_custom_command(
+        TARGET ${target} POST_BUILD
+        COMMAND "${Python_EXECUTABLE}" "${_embedded_python_deploy_script}" deploy
+                "${arg_ROOT}" "${arg_DESTINATION}" ${verify}
+        COMMENT "Deploying Python for ${target}"
+        VERBATIM
+    )
+endfunction()
@@ -0,0 +1,219 @@
+#pragma once
+/// Initialize the embedded interpreter in the background while the application starts up
+///
+/// `Py_InitializeFromConfig()` plus the first imports of large packages can take a second or
+/// more. `AsyncInterpreter` runs them on a dedicated thread so that they overlap with the rest
+/// of the application's initialization (e.g. creating the GUI). The thread reads the home
+/// file (see `embedded_python_generate_home_file()`), initializes an isolated interpreter,
+/// imports the `preload` modules, and then releases the GIL. `ready()` and `wait()` report
+/// the state and the duration of each phase.
+///
+/// Usage:
+///
+///     auto options = embedded_python::AsyncInterpreter::Options{};
+///     options.home_file_dir = exe_dir;
+///     options.preload = {"numpy", "my_package"};
+///     auto python = embedded_python::AsyncInterpreter(std::move(options));
+///     // ... the rest of the application's initialization ...
+///     python.wait();  // rethrows if the initialization failed
+///     auto gil = PyGILState_Ensure();
+///     // ... use Python from any thread, like with a regular interpreter ...
+///     PyGILState_Release(gil);
+///
+/// The dedicated thread owns the interpreter: it's Python's main thread as far as signals are
+/// concerned (only it can install signal handlers) and it finalizes the interpreter when the
+/// `AsyncInterpreter` is destroyed. Until then, it only waits. Other threads use the interpreter
+/// via `PyGILState_Ensure()` and must be done with it before the destruction.
+#include <Python.h>
+
+#include <chrono>
+#include <condition_variable>
+#include <exception>
+#include <filesystem>
+#include <fstream>
+#include <functional>
+#include <future>
+#include <iterator>
+#include <mutex>
+#include <stdexcept>
+#include <string>
+#include <thread>
+#include <utility>
+#include <vector>
+
+namespace embedded_python {
+
+/// Read the Python home from `.embedded_python.home` (or `.embedded_python-core.home`) in `dir`
+inline std::filesystem::path read_home_file(const std::filesystem::path& dir) {
+    for (const auto* name : {".embedded_python.home", ".embedded_python-core.home"}) {
+        auto stream = std::ifstream(dir / name);
+        if (stream) {
+            return std::string(std::istreambuf_iterator<char>(stream),
+                               std::istreambuf_iterator<char>());
+        }
+    }
+    throw std::runtime_error("No embedded_python home file in " + dir.string());
+}
+
+class AsyncInterpreter {
+public:
+    using Seconds = std::chrono::duration<double>;
+
+    struct Options {
+        /// The Python home, or empty to read it from the home file in `home_file_dir`
+        std::filesystem::path home;
+        std::filesystem::path home_file_dir;
+        /// Modules to import after initialization, in this order
+        std::vector<std::string> preload;
+        /// Called before `Py_InitializeFromConfig()` to adjust the isolated config
+        std::function<void(PyConfig&)> configure;
+    };
+
+    struct Preload {
+        std::string module;
+        Seconds duration{0};
+        std::string error;  ///< empty on success
+    };
+
+    struct Timings {
+        Seconds read_home{0};
+        Seconds initialize{0};  ///< `Py_InitializeFromConfig()`
+        std::vector<Preload> preload;
+        Seconds total{0};
+    };
+
+    explicit AsyncInterpreter(Options options) : options_(std::move(options)) {
+        auto promise = std::promise<Timings>();
+        ready_ = promise.get_future().share();
+        thread_ = std::thread([this, promise = std::move(promise)]() mutable {
+            run(std::move(promise));
+        });
+    }
+
+    AsyncInterpreter(const AsyncInterpreter&) = delete;
+    AsyncInterpreter& operator=(const AsyncInterpreter&) = delete;
+
+    /// Finalize the interpreter on its thread (after the initialization is done, if it's not yet)
+    ~AsyncInterpreter() {
+        {
+            auto lock = std::lock_guard(mutex_);
+            stopping_ = true;
+        }
+        stop_.notify_one();
+        thread_.join();
+    }
+
+    /// Is the interpreter initialized (or has the initialization failed)? Doesn't block.
+    bool ready() const {
+        return ready_.wait_for(std::chrono::seconds(0)) == std::future_status::ready;
+    }
+
+    /// Block until the interpreter is ready and return the timings or rethrow the error
+    const Timings& wait() const { return ready_.get(); }
+
+    /// To combine with other futures or to wait with a timeout
+    std::shared_future<Timings> future() const { return ready_; }
+
+private:
+    void run(std::promise<Timings> promise) {
+        const auto start = std::chrono::steady_clock::now();
+        auto timings = Timings{};
+        auto tstate = static_cast<PyThreadState*>(nullptr);
+        try {
+            auto home = options_.home;
+            if (home.empty()) {
+                home = read_home_file(options_.home_file_dir);
+            }
+            timings.read_home = std::chrono::steady_clock::now() - start;
+
+            const auto initialize_start = std::chrono::steady_clock::now();
+            initialize(home);
+            timings.initialize = std::chrono::steady_clock::now() - initialize_start;
+
+            for (const auto& module : options_.preload) {
+                timings.preload.push_back(preload(module));
+            }
+            timings.total = std::chrono::steady_clock::now() - start;
+            tstate = PyEval_SaveThread();
+            promise.set_value(std::move(timings));
+        } catch (...) {
+            if (Py_IsInitialized() && !tstate) {
+                tstate = PyEval_SaveThread();
+            }
+            promise.set_exception(std::current_exception());
+        }
+
+        {
+            auto lock = std::unique_lock(mutex_);
+            stop_.wait(lock, [this] { return stopping_; });
+        }
+        if (tstate) {
+            PyEval_RestoreThread(tstate);
+            Py_FinalizeEx();
+        }
+    }
+
+    void initialize(const std::filesystem::path& home) {
+        auto config = PyConfig{};
+        PyConfig_InitIsolatedConfig(&config);
+        // On POSIX, `path::wstring()` would throw for, or mangle, non-ASCII paths under the
+        // C/POSIX locale: let Python decode the bytes like it does for its own paths
+#if defined(_WIN32)
+        auto status = PyConfig_SetString(&config, &config.home, home.c_str());
+#else
+        auto status = PyConfig_SetBytesString(&config, &config.home, home.c_str());
+#endif
+        if (!PyStatus_Exception(status) && options_.configure) {
+            try {
+                options_.configure(config);
+            } catch (...) {
+                PyConfig_Clear(&config);
+                throw;
+            }
+        }
+        if (!PyStatus_Exception(status)) {
+            status = Py_InitializeFromConfig(&config);
+        }
+        PyConfig_Clear(&config);
+        if (PyStatus_Exception(status)) {
+            throw std::runtime_error(std::string("Failed to initialize Python: ") +
+                                     (status.err_msg ? status.err_msg : "unknown error"));
+        }
+    }
+
+    /// Import `module`: an error is recorded, not raised, since the application may still work
+    static Preload preload(const std::string& module) {
+        auto result = Preload{module};
+        const auto start = std::chrono::steady_clock::now();
+        if (auto imported = PyImport_ImportModule(module.c_str())) {
+            Py_DECREF(imported);
+        } else {
+            result.error = "import failed";
+            auto type = static_cast<PyObject*>(nullptr);
+            auto value = static_cast<PyObject*>(nullptr);
+            auto traceback = static_cast<PyObject*>(nullptr);
+            PyErr_Fetch(&type, &value, &traceback);
+            if (auto message = value ? PyObject_Str(value) : nullptr) {
+                if (const auto* text = PyUnicode_AsUTF8(message)) {
+                    result.error = text;
+                }
+                Py_DECREF(message);
+            }
+            PyErr_Clear();
+            Py_XDECREF(type);
+            Py_XDECREF(value);
+            Py_XDECREF(traceback);
+        }
+        result.duration = std::chrono::steady_clock::now() - start;
+        return result;
+    }
+
+    Options options_;
+    std::shared_future<Timings> ready_;
+    std::mutex mutex_;
+    std::condition_variable stop_;
+    bool stopping_ = false;
+    std::thread thread_;
+};
+
+}  // namespace embedded_python
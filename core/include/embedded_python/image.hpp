@@ -0,0 +1,339 @@
+#pragma once
+/// Run the embedded Python from a single-file environment image (`embedded_python:image=True`)
+///
+/// The image (`embedded_python.image` in the `embedded_python` package) is an uncompressed
+/// `.zip` of the whole environment. The standard library and the pure-Python packages are
+/// imported directly from the image by `zipimport`. Everything else (the extension modules,
+/// shared libraries, and packages with data files) is under `home/` in the image and it's
+/// extracted once into a cache folder named after the Python version and the content hash of
+/// the image. Updating the application replaces the image which then gets extracted into a new
+/// folder on the next start.
+///
+/// Usage, instead of setting `PyConfig::home` to a deployed environment:
+///
+///     auto config = PyConfig{};
+///     PyConfig_InitIsolatedConfig(&config);
+///     embedded_python::configure_from_image(config, exe_dir / "embedded_python.image");
+///     Py_InitializeFromConfig(&config);
+///
+/// Errors are reported as `std::runtime_error`.
+#include <Python.h>
+
+#include <algorithm>
+#include <array>
+#include <cstdint>
+#include <cstdlib>
+#include <filesystem>
+#include <fstream>
+#include <sstream>
+#include <stdexcept>
+#include <string>
+#include <string_view>
+#include <system_error>
+#include <vector>
+
+#if defined(_WIN32)
+#include <process.h>
+#else
+#include <unistd.h>
+#endif
+
+namespace embedded_python {
+
+namespace detail {
+
+struct ImageEntry {
+    std::string name;
+    std::uint16_t method = 0;
+    std::uint64_t size = 0;
+    std::uint64_t local_header_offset = 0;
+    std::uint32_t mode = 0;  // POSIX file type and permissions, if any
+};
+
+struct Image {
+    std::string version;  // Python version and ABI flags, e.g. 3.13.5 or 3.13.5t
+    std::string hash;     // SHA-256 of the image contents
+    std::vector<ImageEntry> entries;
+};
+
+template<class T>
+T read_le(const char* data) {
+    auto value = T{0};
+    for (auto i = sizeof(T); i-- > 0;) {
+        value = static_cast<T>((value << 8) | static_cast<unsigned char>(data[i]));
+    }
+    return value;
+}
+
+inline std::vector<char> read_at(std::ifstream& file, std::uint64_t offset, std::size_t size) {
+    auto buffer = std::vector<char>(size);
+    file.seekg(static_cast<std::streamoff>(offset));
+    if (!file.read(buffer.data(), static_cast<std::streamsize>(size))) {
+        throw std::runtime_error("embedded_python image: unexpected end of file");
+    }
+    return buffer;
+}
+
+/// Read the identity (from the archive comment) and the central directory of the image
+inline Image read_image(const std::filesystem::path& path) {
+    auto file = std::ifstream(path, std::ios::binary);
+    if (!file) {
+        throw std::runtime_error("embedded_python image not found: " + path.string());
+    }
+    const auto file_size = static_cast<std::uint64_t>(std::filesystem::file_size(path));
+
+    // The end of central directory record is followed by a comment of at most 64 KiB
+    constexpr auto eocd_size = std::uint64_t{22};
+    const auto tail_size = std::min<std::uint64_t>(file_size, eocd_size + 0xFFFF);
+    const auto tail = read_at(file, file_size - tail_size, tail_size);
+    auto eocd = std::int64_t{-1};
+    for (auto i = static_cast<std::int64_t>(tail_size - eocd_size); i >= 0; --i) {
+        if (read_le<std::uint32_t>(&tail[i]) == 0x06054b50) {
+            eocd = i;
+            break;
+        }
+    }
+    if (eocd < 0) {
+        throw std::runtime_error("embedded_python image is not a valid archive: " + path.string());
+    }
+
+    const auto* record = &tail[eocd];
+    auto entry_count = std::uint64_t{read_le<std::uint16_t>(record + 10)};
+    auto directory_offset = std::uint64_t{read_le<std::uint32_t>(record + 16)};
+    const auto comment_size = read_le<std::uint16_t>(record + 20);
+    auto comment = std::istringstream(std::string(record + eocd_size, comment_size));
+
+    auto image = Image{};
+    auto magic = std::string{};
+    comment >> magic >> image.version >> image.hash;
+    if (magic != "embedded_python-image" || image.hash.size() != 64) {
+        throw std::runtime_error("not an embedded_python image: " + path.string());
+    }
+
+    // ZIP64: more than 65535 entries or more than 4 GiB
+    const auto eocd_offset = file_size - tail_size + static_cast<std::uint64_t>(eocd);
+    if (eocd_offset >= 20) {
+        const auto locator = read_at(file, eocd_offset - 20, 20);
+        if (read_le<std::uint32_t>(locator.data()) == 0x07064b50) {
+            const auto zip64 = read_at(file, read_le<std::uint64_t>(locator.data() + 8), 56);
+            entry_count = read_le<std::uint64_t>(zip64.data() + 32);
+            directory_offset = read_le<std::uint64_t>(zip64.data() + 48);
+        }
+    }
+
+    file.seekg(static_cast<std::streamoff>(directory_offset));
+    for (auto i = std::uint64_t{0}; i < entry_count; ++i) {
+        auto header = std::array<char, 46>{};
+        if (!file.read(header.data(), header.size()) ||
+            read_le<std::uint32_t>(header.data()) != 0x02014b50) {
+            throw std::runtime_error("embedded_python image: corrupt central directory");
+        }
+        auto entry = ImageEntry{};
+        const auto made_by_unix = (read_le<std::uint16_t>(&header[4]) >> 8) == 3;
+        entry.method = read_le<std::uint16_t>(&header[10]);
+        entry.size = read_le<std::uint32_t>(&header[20]);
+        const auto name_size = read_le<std::uint16_t>(&header[28]);
+        const auto extra_size = read_le<std::uint16_t>(&header[30]);
+        const auto comment_size = read_le<std::uint16_t>(&header[32]);
+        entry.mode = made_by_unix ? read_le<std::uint32_t>(&header[38]) >> 16 : 0;
+        entry.local_header_offset = read_le<std::uint32_t>(&header[42]);
+        const auto uncompressed_size = read_le<std::uint32_t>(&header[24]);
+
+        entry.name.resize(name_size);
+        auto extra = std::vector<char>(extra_size);
+        file.read(entry.name.data(), name_size);
+        file.read(extra.data(), extra_size);
+        file.seekg(comment_size, std::ios::cur);
+
+        // ZIP64 extended information: only the fields which overflowed, in this order
+        for (auto pos = std::size_t{0}; pos + 4 <= extra.size();) {
+            const auto id = read_le<std::uint16_t>(&extra[pos]);
+            const auto size = read_le<std::uint16_t>(&extra[pos + 2]);
+            if (id == 0x0001) {
+                auto field = pos + 4;
+                if (uncompressed_size == 0xFFFFFFFF) {
+                    field += 8;
+                }
+                if (entry.size == 0xFFFFFFFF) {
+                    entry.size = read_le<std::uint64_t>(&extra[field]);
+                    field += 8;
+                }
+                if (entry.local_header_offset == 0xFFFFFFFF) {
+                    entry.local_header_offset = read_le<std::uint64_t>(&extra[field]);
+                }
+            }
+            pos += 4 + size;
+        }
+        image.entries.push_back(std::move(entry));
+    }
+    return image;
+}
+
+inline std::filesystem::path env_path(const char* name) {
+    const auto* value = std::getenv(name);
+    return value && *value ? std::filesystem::path(value) : std::filesystem::path{};
+}
+
+/// Copy the contents of `home/` in the image to `destination`
+inline void extract_home(const std::filesystem::path& path, const Image& image,
+                         const std::filesystem::path& destination) {
+    constexpr auto prefix = std::string_view("home/");
+    auto file = std::ifstream(path, std::ios::binary);
+    for (const auto& entry : image.entries) {
+        if (entry.name.compare(0, prefix.size(), prefix) != 0 ||
+            entry.name.size() == prefix.size()) {
+            continue;
+        }
+        if (entry.method != 0) {
+            throw std::runtime_error("embedded_python image: compressed entry " + entry.name);
+        }
+        const auto target = destination / std::filesystem::u8path(entry.name.substr(prefix.size()));
+        if (entry.name.back() == '/') {
+            std::filesystem::create_directories(target);
+            continue;
+        }
+        std::filesystem::create_directories(target.parent_path());
+
+        const auto local_header = read_at(file, entry.local_header_offset, 30);
+        const auto data_offset = entry.local_header_offset + 30 +
+                                 read_le<std::uint16_t>(&local_header[26]) +
+                                 read_le<std::uint16_t>(&local_header[28]);
+        const auto data = read_at(file, data_offset, static_cast<std::size_t>(entry.size));
+
+        constexpr auto file_type_mask = 0170000u;
+        constexpr auto symlink_type = 0120000u;
+        if ((entry.mode & file_type_mask) == symlink_type) {
+            std::filesystem::create_symlink(std::string(data.begin(), data.end()), target);
+            continue;
+        }
+        auto out = std::ofstream(target, std::ios::binary);
+        out.write(data.data(), static_cast<std::streamsize>(data.size()));
+        if (!out) {
+            throw std::runtime_error("embedded_python image: failed to write " + target.string());
+        }
+        out.close();
+        if (entry.mode & 0777) {
+            std::filesystem::permissions(target,
+                                         static_cast<std::filesystem::perms>(entry.mode & 0777));
+        }
+    }
+}
+
+inline void check(PyStatus status) {
+    if (PyStatus_Exception(status)) {
+        throw std::runtime_error(status.err_msg ? status.err_msg : "PyConfig error");
+    }
+}
+
+/// Set a path in `config` like Python decodes `char*` paths on POSIX: `path::wstring()` would
+/// throw for, or mangle, non-ASCII paths under the C/POSIX locale
+inline PyStatus set_path(PyConfig& config, wchar_t** field, const std::filesystem::path& path) {
+#if defined(_WIN32)
+    return PyConfig_SetString(&config, field, path.c_str());
+#else
+    return PyConfig_SetBytesString(&config, field, path.c_str());
+#endif
+}
+
+/// Append a path to `list`, decoded the same way as `set_path()`, which must be called first
+inline PyStatus append_path(PyWideStringList& list, const std::filesystem::path& path) {
+#if defined(_WIN32)
+    return PyWideStringList_Append(&list, path.c_str());
+#else
+    auto* decoded = Py_DecodeLocale(path.c_str(), nullptr);
+    if (!decoded) {
+        return PyStatus_Error("embedded_python image: failed to decode a module path");
+    }
+    const auto status = PyWideStringList_Append(&list, decoded);
+    PyMem_RawFree(decoded);
+    return status;
+#endif
+}
+
+}  // namespace detail
+
+/// Where images are extracted by default: the user's cache folder, e.g. `~/.cache/embedded_python`
+inline std::filesystem::path default_image_cache() {
+#if defined(_WIN32)
+    auto base = detail::env_path("LOCALAPPDATA");
+#elif defined(__APPLE__)
+    auto base = detail::env_path("HOME");
+    if (!base.empty()) {
+        base /= "Library/Caches";
+    }
+#else
+    auto base = detail::env_path("XDG_CACHE_HOME");
+    if (base.empty() && !detail::env_path("HOME").empty()) {
+        base = detail::env_path("HOME") / ".cache";
+    }
+#endif
+    if (base.empty()) {
+        base = std::filesystem::temp_directory_path();
+    }
+    return base / "embedded_python";
+}
+
+/// Extract the native parts of `image` into `cache` (only once per image) and return that folder
+///
+/// Extraction goes to a temporary folder which is then renamed so that processes starting at the
+/// same time never see a partial extraction.
+inline std::filesystem::path extract_image(
+    const std::filesystem::path& image_path,
+    const std::filesystem::path& cache = default_image_cache()) {
+    const auto image = detail::read_image(image_path);
+    const auto home = cache / (image.version + "-" + image.hash.substr(0, 16));
+    if (std::filesystem::exists(home)) {
+        return home;
+    }
+
+#if defined(_WIN32)
+    const auto pid = _getpid();
+#else
+    const auto pid = getpid();
+#endif
+    auto tmp = home;
+    tmp += ".tmp-" + std::to_string(pid);
+    std::filesystem::remove_all(tmp);
+    try {
+        std::filesystem::create_directories(tmp);
+        detail::extract_home(image_path, image, tmp);
+        std::filesystem::rename(tmp, home);
+    } catch (...) {
+        auto ec = std::error_code{};
+        std::filesystem::remove_all(tmp, ec);
+        if (!std::filesystem::exists(home)) {
+            throw;
+        }
+        // Another process extracted the same image in the meantime
+    }
+    return home;
+}
+
+/// Point `config` at the environment in `image_path`: `home` and the module search paths
+inline void configure_from_image(PyConfig& config, const std::filesystem::path& image_path,
+                                 const std::filesystem::path& cache = default_image_cache()) {
+    const auto image = std::filesystem::absolute(image_path);
+    const auto home = extract_image(image, cache);
+    detail::check(detail::set_path(config, &config.home, home));
+
+    // `image:<path>` entries are inside of the image, `home:<path>` in the extracted folder
+    auto paths = std::ifstream(home / ".embedded_python-image.paths");
+    if (!paths) {
+        throw std::runtime_error("embedded_python image: missing the list of module paths");
+    }
+    config.module_search_paths_set = 1;
+    for (auto line = std::string{}; std::getline(paths, line);) {
+        auto path = std::filesystem::path{};
+        if (line.rfind("image:", 0) == 0) {
+            path = image / std::filesystem::u8path(line.substr(6));
+        } else if (line.rfind("home:", 0) == 0) {
+            path = home / std::filesystem::u8path(line.substr(5));
+        } else {
+            continue;
+        }
+        const auto entry = path.lexically_normal().make_preferred();
+        detail::check(detail::append_path(config.module_search_paths, entry));
+    }
+}
+
+}  // namespace embedded_python
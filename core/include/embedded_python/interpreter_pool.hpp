@@ -0,0 +1,258 @@
+#pragma once
+/// A pool of isolated sub-interpreters, each with its own GIL, for running Python in parallel
+///
+/// With a single interpreter, all Python code in the process is serialized by one GIL. Since
+/// Python 3.12, sub-interpreters can have their own GIL (PEP 684) so that Python code running
+/// in different sub-interpreters can make use of multiple cores. Each interpreter in the pool
+/// lives on its own worker thread (a thread state can't move between threads) and the workers
+/// take tasks from a shared queue.
+///
+/// Usage, after `Py_InitializeFromConfig()` on the main thread:
+///
+///     auto pool = embedded_python::InterpreterPool(4);
+///     auto result = pool.submit([] { return PyRun_SimpleString("import json"); });
+///     result.get();
+///
+/// Tasks run on a worker thread with the thread state of that worker's sub-interpreter attached
+/// (i.e. its GIL held) so they can call the Python C API directly. Objects must not be shared
+/// between interpreters. Any Python exception which is still set after a task is printed and
+/// cleared. C++ exceptions are forwarded to the returned `std::future`.
+///
+/// The pool must be created and destroyed on a thread which holds the main interpreter's GIL.
+/// It's released while the workers create and destroy their interpreters. Destroy the pool
+/// before `Py_Finalize()`. Note that only extension modules which support multi-phase init
+/// and a per-interpreter GIL can be imported in isolated sub-interpreters (see
+/// `check_multi_interp_extensions`), e.g. the standard library but not all `pip` packages.
+#include <Python.h>
+
+#if PY_VERSION_HEX < 0x030C0000
+#error "embedded_python/interpreter_pool.hpp requires Python 3.12 or newer"
+#endif
+
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <cstdint>
+#include <deque>
+#include <functional>
+#include <future>
+#include <memory>
+#include <mutex>
+#include <stdexcept>
+#include <string>
+#include <thread>
+#include <type_traits>
+#include <vector>
+
+namespace embedded_python {
+
+/// Fully isolated sub-interpreter with its own GIL
+inline PyInterpreterConfig isolated_interpreter_config() {
+    auto config = PyInterpreterConfig{};
+    config.use_main_obmalloc = 0;
+    config.allow_fork = 0;
+    config.allow_exec = 0;
+    config.allow_threads = 1;
+    config.allow_daemon_threads = 0;
+    config.check_multi_interp_extensions = 1;
+    config.gil = PyInterpreterConfig_OWN_GIL;
+    return config;
+}
+
+struct InterpreterStats {
+    std::uint64_t tasks_completed = 0;
+    std::chrono::nanoseconds busy_time{0};
+    /// Fraction of the time since the pool was created which was spent running tasks
+    double utilization = 0.0;
+};
+
+struct InterpreterPoolStats {
+    /// Number of submitted tasks which are not running yet
+    std::size_t queue_depth = 0;
+    std::vector<InterpreterStats> interpreters;
+};
+
+class InterpreterPool {
+public:
+    /// Create `size` sub-interpreters and run `initializer` once in each (e.g. for imports)
+    explicit InterpreterPool(std::size_t size, std::function<void()> initializer = {},
+                             PyInterpreterConfig config = isolated_interpreter_config())
+        : config_(config), initializer_(std::move(initializer)), workers_(size) {
+        if (size == 0) {
+            throw std::invalid_argument("InterpreterPool requires at least one interpreter");
+        }
+
+        Py_BEGIN_ALLOW_THREADS;
+        for (auto& worker : workers_) {
+            worker.thread = std::thread([this, &worker] { run(worker); });
+        }
+        {
+            auto lock = std::unique_lock(mutex_);
+            ready_.wait(lock, [this] { return started_ == workers_.size(); });
+        }
+        Py_END_ALLOW_THREADS;
+
+        if (!errors_.empty()) {
+            shutdown();
+            throw std::runtime_error("Failed to start a sub-interpreter: " + errors_.front());
+        }
+    }
+
+    InterpreterPool(const InterpreterPool&) = delete;
+    InterpreterPool& operator=(const InterpreterPool&) = delete;
+
+    /// Finish all queued tasks and end the sub-interpreters
+    ~InterpreterPool() { shutdown(); }
+
+    /// Run `task` in one of the sub-interpreters
+    template<class F>
+    auto submit(F&& task) -> std::future<std::invoke_result_t<F>> {
+        using Result = std::invoke_result_t<F>;
+        auto packaged = std::make_shared<std::packaged_task<Result()>>(std::forward<F>(task));
+        auto future = packaged->get_future();
+        {
+            auto lock = std::lock_guard(mutex_);
+            if (stopping_) {
+                throw std::runtime_error("InterpreterPool is shutting down");
+            }
+            queue_.emplace_back([packaged] { (*packaged)(); });
+        }
+        task_available_.notify_one();
+        return future;
+    }
+
+    std::size_t size() const { return workers_.size(); }
+
+    InterpreterPoolStats stats() const {
+        auto stats = InterpreterPoolStats{};
+        {
+            auto lock = std::lock_guard(mutex_);
+            stats.queue_depth = queue_.size();
+        }
+        const auto elapsed = std::chrono::steady_clock::now() - start_time_;
+        for (const auto& worker : workers_) {
+            auto s = InterpreterStats{};
+            s.tasks_completed = worker.tasks_completed.load();
+            s.busy_time = std::chrono::nanoseconds(worker.busy_ns.load());
+            if (elapsed.count() > 0) {
+                s.utilization = std::chrono::duration<double>(s.busy_time).count() /
+                                std::chrono::duration<double>(elapsed).count();
+            }
+            stats.interpreters.push_back(s);
+        }
+        return stats;
+    }
+
+private:
+    struct Worker {
+        std::thread thread;
+        std::atomic<std::uint64_t> tasks_completed{0};
+        std::atomic<std::int64_t> busy_ns{0};
+    };
+
+    void run(Worker& worker) {
+        // Creating a sub-interpreter requires an attached thread state of the main interpreter.
+        // With `PyInterpreterConfig_OWN_GIL`, it's detached (the main GIL is released) once the
+        // new interpreter's thread state is attached.
+        auto gil_state = PyGILState_Ensure();
+        auto main_tstate = PyThreadState_Get();
+        auto tstate = static_cast<PyThreadState*>(nullptr);
+        if (auto status = Py_NewInterpreterFromConfig(&tstate, &config_);
+            PyStatus_Exception(status)) {
+            PyGILState_Release(gil_state);
+            started(status.err_msg ? status.err_msg : "unknown error");
+            return;
+        }
+        auto error = std::string{};
+        if (initializer_) {
+            try {
+                initializer_();
+            } catch (const std::exception& e) {
+                error = e.what();
+            }
+            print_error();
+        }
+        tstate = PyEval_SaveThread();
+        started(std::move(error));
+
+        while (auto task = next_task()) {
+            const auto start = std::chrono::steady_clock::now();
+            PyEval_RestoreThread(tstate);
+            task();
+            print_error();
+            tstate = PyEval_SaveThread();
+            const auto busy = std::chrono::steady_clock::now() - start;
+            worker.busy_ns += std::chrono::duration_cast<std::chrono::nanoseconds>(busy).count();
+            ++worker.tasks_completed;
+        }
+
+        PyEval_RestoreThread(tstate);
+        Py_EndInterpreter(tstate);
+        PyEval_RestoreThread(main_tstate);
+        PyGILState_Release(gil_state);
+    }
+
+    void started(std::string error) {
+        {
+            auto lock = std::lock_guard(mutex_);
+            if (!error.empty()) {
+                errors_.push_back(std::move(error));
+            }
+            ++started_;
+        }
+        ready_.notify_all();
+    }
+
+    /// Wait for the next task, or return an empty function once the pool is shut down
+    std::function<void()> next_task() {
+        auto lock = std::unique_lock(mutex_);
+        task_available_.wait(lock, [this] { return stopping_ || !queue_.empty(); });
+        if (queue_.empty()) {
+            return {};
+        }
+        auto task = std::move(queue_.front());
+        queue_.pop_front();
+        return task;
+    }
+
+    static void print_error() {
+        if (PyErr_Occurred()) {
+            PyErr_Print();
+        }
+    }
+
+    void shutdown() {
+        {
+            auto lock = std::lock_guard(mutex_);
+            if (stopping_) {
+                return;
+            }
+            stopping_ = true;
+        }
+        task_available_.notify_all();
+
+        // The workers need the main GIL to clean up their thread states
+        Py_BEGIN_ALLOW_THREADS;
+        for (auto& worker : workers_) {
+            if (worker.thread.joinable()) {
+                worker.thread.join();
+            }
+        }
+        Py_END_ALLOW_THREADS;
+    }
+
+    PyInterpreterConfig config_;
+    std::function<void()> initializer_;
+    std::vector<Worker> workers_;
+    const std::chrono::steady_clock::time_point start_time_ = std::chrono::steady_clock::now();
+
+    mutable std::mutex mutex_;
+    std::condition_variable task_available_;
+    std::condition_variable ready_;
+    std::deque<std::function<void()>> queue_;
+    std::size_t started_ = 0;
+    std::vector<std::string> errors_;
+    bool stopping_ = false;
+};
+
+}  // namespace embedded_python
@@ -0,0 +1,80 @@
+#pragma once
+/// Make Python frames visible to `perf` and other native profilers of an embedding application
+///
+/// Since Python 3.12, CPython can run each Python function through a small trampoline with its
+/// own machine code address and write the mapping to `/tmp/perf-<pid>.map` (or jitdump files
+/// with Python 3.13+, for `perf inject --jit`). Native stacks then show Python function names
+/// in between the C/C++ frames. It's only available on Linux and it's enabled via `-X perf`,
+/// `PYTHONPERFSUPPORT=1`, or `PyConfig::perf_profiling`. The isolated config used for
+/// embedding ignores the environment variables so this header provides the means to opt in.
+/// Use `embedded_python-core/*:perf_profiling=True` to also build with frame pointers which
+/// `perf` and eBPF tools need for reliable native stacks through `libpython`.
+///
+/// Usage:
+///
+///     auto config = PyConfig{};
+///     PyConfig_InitIsolatedConfig(&config);
+///     embedded_python::enable_perf_profiling(config, embedded_python::perf_mode_from_env());
+///     Py_InitializeFromConfig(&config);
+#include <Python.h>
+
+#include <cstdlib>
+#include <cstring>
+
+namespace embedded_python {
+
+enum class PerfMode {
+    off = 0,
+    perf_map = 1,  // `/tmp/perf-<pid>.map`, read by `perf report` directly
+    jitdump = 2,   // `jit-<pid>.dump` (Python 3.13+), requires `perf record -k 1` and `perf inject`
+};
+
+/// Is the perf trampoline compiled into this Python (Linux, Python 3.12+)?
+constexpr bool perf_profiling_available() {
+#if PY_VERSION_HEX >= 0x030C0000 && defined(PY_HAVE_PERF_TRAMPOLINE)
+    return true;
+#else
+    return false;
+#endif
+}
+
+/// The mode requested via `PYTHON_PERF_JIT_SUPPORT` or `PYTHONPERFSUPPORT` (`off` if neither)
+///
+/// The same variables as for the `python` executable, so profiling can be enabled for a
+/// production host process without rebuilding it.
+inline PerfMode perf_mode_from_env() {
+    const auto is_set = [](const char* name) {
+        const auto* value = std::getenv(name);
+        return value && *value && std::strcmp(value, "0") != 0;
+    };
+    if (is_set("PYTHON_PERF_JIT_SUPPORT")) {
+        return PerfMode::jitdump;
+    }
+    if (is_set("PYTHONPERFSUPPORT")) {
+        return PerfMode::perf_map;
+    }
+    return PerfMode::off;
+}
+
+/// Set `PyConfig::perf_profiling` before `Py_InitializeFromConfig()`
+///
+/// Returns `false` if `mode` isn't supported by this Python, in which case `config` is left
+/// unchanged: initialization would fail otherwise. `jitdump` falls back to `perf_map` before
+/// Python 3.13.
+inline bool enable_perf_profiling(PyConfig& config, PerfMode mode = PerfMode::perf_map) {
+    if (mode == PerfMode::off) {
+        return true;
+    }
+#if PY_VERSION_HEX >= 0x030C0000 && defined(PY_HAVE_PERF_TRAMPOLINE)
+#if PY_VERSION_HEX < 0x030D0000
+    mode = PerfMode::perf_map;
+#endif
+    config.perf_profiling = static_cast<int>(mode);
+    return true;
+#else
+    (void)config;
+    return false;
+#endif
+}
+
+}  // namespace embedded_python
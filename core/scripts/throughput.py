@@ -0,0 +1,108 @@
+"""Measure the interpreter's throughput on a few CPU-bound pure-Python workloads
+
+This is intentionally small: it runs at package time and should only take a few seconds. The
+workloads cover the usual hot spots of interpreter-bound code: function calls, integer math,
+dict/attribute access, string manipulation, and sorting. Each one is timed several times and
+we report the best and mean times. Compare reports of different packages to see the effect of
+recipe options (e.g. `optimizations`) on the same machine.
+"""
+
+import sys
+import json
+import time
+import argparse
+import platform
+import sysconfig
+import statistics
+
+
+def fib(n):
+    return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+
+def bench_calls():
+    fib(22)
+
+
+def bench_int_math():
+    total = 0
+    for i in range(200_000):
+        total += (i * i) % 7 ^ (i >> 3)
+    return total
+
+
+def bench_dicts():
+    d = {}
+    for i in range(100_000):
+        d[f"k{i % 5000}"] = i
+    return sum(d[f"k{i}"] for i in range(5000))
+
+
+class Point:
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def bench_objects():
+    points = [Point(i, -i) for i in range(50_000)]
+    return sum(p.x + p.y for p in points)
+
+
+def bench_strings():
+    parts = [str(i) for i in range(50_000)]
+    text = ",".join(parts)
+    return len(text.split(",")), text.upper().count("9")
+
+
+def bench_sort():
+    data = [((i * 7919) % 10007, str(i)) for i in range(50_000)]
+    return sorted(data)[0]
+
+
+BENCHMARKS = {
+    "calls": bench_calls,
+    "int_math": bench_int_math,
+    "dicts": bench_dicts,
+    "objects": bench_objects,
+    "strings": bench_strings,
+    "sort": bench_sort,
+}
+
+
+def run(benchmark, repeat):
+    benchmark()  # warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        benchmark()
+        timings.append(time.perf_counter() - start)
+    return {"min": min(timings), "mean": statistics.mean(timings)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", required=True, help="path of the JSON report")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs")
+    args = parser.parse_args()
+
+    results = {name: run(benchmark, args.repeat) for name, benchmark in BENCHMARKS.items()}
+    report = {
+        "python": sys.version,
+        "platform": platform.platform(),
+        "config_args": sysconfig.get_config_var("CONFIG_ARGS"),
+        "unit": "seconds",
+        "benchmarks": results,
+        "total_min": sum(r["min"] for r in results.values()),
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, r in results.items():
+        print(f"{name:>10}: {r['min'] * 1000:8.2f} ms (mean {r['mean'] * 1000:8.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import sys
+import json
+import shutil
 import pathlib
 import subprocess
 from conan import ConanFile
+from conan.tools import scm
 from conan.tools.cmake import CMake, cmake_layout
 
 
@@ -63,13 +66,135 @@ class TestEmbeddedPythonCore(ConanFile):
         """Ensure that everything is available to compile and link to the embedded Python"""
         self.run(pathlib.Path(self.cpp.build.bindir, "test_package").absolute(), env="conanrun")
 
+    def _test_deploy(self):
+        """Ensure that `embedded_python_deploy()` copied every file in the manifest"""
+        with open(self._core_package_path / "embedded_python.manifest") as f:
+            manifest = json.load(f)
+        deployed = pathlib.Path(self.cpp.build.bindir, "python").absolute()
+        missing = [path for path in manifest["files"] if not (deployed / path).is_file()]
+        assert not missing, f"Files missing from the deployment: {missing}"
+
+    def _test_redeploy(self):
+        """Ensure that a redeployment handles files which become symlinks and vice versa"""
+        if self.settings.os == "Windows":
+            return  # creating symlinks requires special privileges
+
+        script = self._core_package_path / "embedded_python-deploy.py"
+        root = pathlib.Path(self.build_folder, "redeploy")
+        shutil.rmtree(root, ignore_errors=True)
+        destination = root / "deployed"
+        versions = [root / "v1/embedded_python", root / "v2/embedded_python"]
+        (versions[0] / "lib/real").mkdir(parents=True)
+        (versions[0] / "lib/libfoo.so.1").write_text("v1")
+        (versions[0] / "lib/libfoo.so").symlink_to("libfoo.so.1")
+        (versions[0] / "lib/real/module.py").write_text("v1")
+        (versions[0] / "lib/package").symlink_to("real")
+        (versions[1] / "lib/package").mkdir(parents=True)
+        (versions[1] / "lib/libfoo.so").write_text("v2")
+        (versions[1] / "lib/package/module.py").write_text("v2")
+
+        def tree(folder):
+            return {
+                path.relative_to(folder).as_posix(): (
+                    f"-> {path.readlink()}" if path.is_symlink() else path.read_text()
+                )
+                for path in folder.rglob("*")
+                if path.is_symlink() or path.is_file() and path.name != ".embedded_python.deployed"
+            }
+
+        for version in versions + versions:
+            self.run(f'{self._py_exe} "{script}" deploy "{version}" "{destination}"')
+            assert tree(destination) == tree(version), f"{tree(destination)} != {tree(version)}"
+
+    def _test_async_interpreter(self):
+        """Ensure that the interpreter initializes in the background and preloads modules"""
+        exe = pathlib.Path(self.cpp.build.bindir, "test_async_interpreter").absolute()
+        self.run(exe, env="conanrun")
+
+    def _test_interpreter_pool(self):
+        """Ensure that the sub-interpreter pool runs Python code in parallel (Python >= 3.12)"""
+        version = self.dependencies["embedded_python-core"].options.version
+        if scm.Version(version) < "3.12":
+            return
+
+        exe = pathlib.Path(self.cpp.build.bindir, "test_interpreter_pool").absolute()
+        self.run(exe, env="conanrun")
+
     def _test_licenses(self):
         """Ensure that the license file is included"""
         file = self._core_package_path / "licenses/LICENSE.txt"
         print(f"{file}: {file.stat().st_size}")
 
+    def _test_reports(self):
+        """Ensure that the throughput report is included"""
+        file = self._core_package_path / "reports/throughput.json"
+        with open(file) as f:
+            report = json.load(f)
+        print(f"{file}: optimizations={report['optimizations']}, total={report['total_min']:.3f}s")
+
+    def _test_frozen_modules(self):
+        """Ensure that the modules requested via the `frozen_modules` option are frozen"""
+        names = self.dependencies["embedded_python-core"].options.get_safe("frozen_modules")
+        if not names:
+            return
+
+        names = str(names).replace(",", " ")
+        code = "import _imp, sys; missing = [n for n in sys.argv[1:] if not _imp.is_frozen(n)]"
+        self.run(f'{self._py_exe} -c "{code}; assert not missing, missing" {names}')
+
+    def _test_builtin_modules(self):
+        """Ensure that the `builtin_modules` are linked into `libpython`"""
+        names = self.dependencies["embedded_python-core"].options.get_safe("builtin_modules")
+        if not names:
+            return
+
+        names = str(names).replace(",", " ")
+        code = (
+            "import sys; missing = [n for n in sys.argv[1:] if n not in sys.builtin_module_names]"
+        )
+        self.run(f'{self._py_exe} -c "{code}; assert not missing, missing" {names}')
+
+    def _test_perf_profiling(self):
+        """Ensure that `perf_profiling` builds with frame pointers and the perf trampoline"""
+        if not self.dependencies["embedded_python-core"].options.get_safe("perf_profiling"):
+            return
+
+        code = "import sysconfig; flags = sysconfig.get_config_var('CFLAGS')"
+        code += "; assert '-fno-omit-frame-pointer' in flags, flags"
+        self.run(f'{self._py_exe} -c "{code}"')
+        version = self.dependencies["embedded_python-core"].options.version
+        if self.settings.os == "Linux" and scm.Version(version) >= "3.12":
+            self.run(pathlib.Path(self.cpp.build.bindir, "test_perf").absolute(), env="conanrun")
+
+    def _test_free_threaded(self):
+        """Ensure that the free-threaded build runs without the GIL"""
+        if not self.dependencies["embedded_python-core"].options.get_safe("free_threaded"):
+            return
+
+        code = "import sys, sysconfig; assert sysconfig.get_config_var('Py_GIL_DISABLED')"
+        self.run(f'{self._py_exe} -c "{code}; assert not sys._is_gil_enabled()"')
+
+    def _test_allocator(self):
+        """Ensure that pymalloc is disabled when another allocator is linked in"""
+        allocator = self.dependencies["embedded_python-core"].options.get_safe("allocator")
+        if not allocator or allocator == "default":
+            return
+
+        code = "import sysconfig; assert not sysconfig.get_config_var('WITH_PYMALLOC')"
+        self.run(f'{self._py_exe} -c "{code}"')
+
     def test(self):
         self._test_stdlib()
         self._test_libpython_path()
         self._test_embed()
+        self._test_deploy()
+        self._test_redeploy()
+        self._test_async_interpreter()
+        self._test_interpreter_pool()
         self._test_licenses()
+        self._test_reports()
+        self._test_frozen_modules()
+        self._test_builtin_modules()
+        self._test_free_threaded()
+        self._test_allocator()
+        self._test_perf_profiling()
@@ -0,0 +1,44 @@
+#include <embedded_python/async_interpreter.hpp>
+#include <iostream>
+
+/// Initialize Python in the background, overlap it with other work, and then use it
+int main(int argc, const char* argv[]) {
+    auto options = embedded_python::AsyncInterpreter::Options{};
+    options.home_file_dir = std::filesystem::path(argv[0]).parent_path();
+    options.preload = {"json", "decimal", "embedded_python_no_such_module"};
+    auto python = embedded_python::AsyncInterpreter(std::move(options));
+
+    // Stand-in for the rest of the application's initialization
+    auto other_work = 0ull;
+    for (auto i = 0ull; i < 10'000'000ull; ++i) {
+        other_work += i % 7;
+    }
+    std::cout << "Other work done (" << other_work << "), Python ready: " << python.ready()
+              << std::endl;
+
+    const auto& timings = python.wait();
+    std::cout << "read_home: " << timings.read_home.count() << " s\n"
+              << "initialize: " << timings.initialize.count() << " s\n";
+    for (const auto& preload : timings.preload) {
+        std::cout << "import " << preload.module << ": " << preload.duration.count() << " s "
+                  << preload.error << "\n";
+    }
+    std::cout << "total: " << timings.total.count() << " s" << std::endl;
+    if (timings.preload.size() != 3 || !timings.preload[0].error.empty() ||
+        timings.preload[2].error.empty()) {
+        std::cerr << "Unexpected preload results" << std::endl;
+        return 1;
+    }
+
+    // Any thread can use the interpreter once it's ready
+    auto result = 0;
+    std::thread([&result] {
+        auto gil = PyGILState_Ensure();
+        result = PyRun_SimpleString(R"(
+import sys
+assert "json" in sys.modules and "decimal" in sys.modules
+)");
+        PyGILState_Release(gil);
+    }).join();
+    return result;
+}
@@ -0,0 +1,60 @@
+#include <embedded_python/interpreter_pool.hpp>
+#include <filesystem>
+#include <iostream>
+
+#include "python_home.hpp"
+
+/// Evaluate a Python expression in the current interpreter and return it as an integer
+long long evaluate(const char* expression) {
+    auto globals = PyDict_New();
+    auto result = PyRun_String(expression, Py_eval_input, globals, globals);
+    Py_DECREF(globals);
+    if (!result) {
+        PyErr_Print();
+        throw std::runtime_error(std::string("Failed to evaluate: ") + expression);
+    }
+    const auto value = PyLong_AsLongLong(result);
+    Py_DECREF(result);
+    return value;
+}
+
+/// Run CPU-bound Python tasks on a pool of sub-interpreters and check the results
+int main(int argc, const char* argv[]) {
+    auto config = PyConfig{};
+    PyConfig_InitIsolatedConfig(&config);
+    const auto python_home = find_python_home(std::filesystem::path(argv[0]).parent_path());
+    if (auto status = PyConfig_SetBytesString(&config, &config.home, python_home.c_str());
+        PyStatus_Exception(status)) {
+        PyConfig_Clear(&config);
+        return 1;
+    }
+    if (auto status = Py_InitializeFromConfig(&config); PyStatus_Exception(status)) {
+        PyConfig_Clear(&config);
+        return 1;
+    }
+    PyConfig_Clear(&config);
+
+    const auto expected = evaluate("sum(i * i for i in range(100_000))");
+    {
+        auto pool = embedded_python::InterpreterPool(4, [] { PyRun_SimpleString("import math"); });
+        auto results = std::vector<std::future<long long>>();
+        for (auto i = 0; i < 16; ++i) {
+            results.push_back(
+                pool.submit([] { return evaluate("sum(i * i for i in range(100_000))"); }));
+        }
+        for (auto& result : results) {
+            if (result.get() != expected) {
+                std::cerr << "Unexpected result from a sub-interpreter" << std::endl;
+                return 1;
+            }
+        }
+
+        const auto stats = pool.stats();
+        std::cout << "Sub-interpreter pool: queue depth " << stats.queue_depth << std::endl;
+        for (const auto& interpreter : stats.interpreters) {
+            std::cout << "  tasks: " << interpreter.tasks_completed
+                      << ", utilization: " << interpreter.utilization << std::endl;
+        }
+    }
+    Py_Finalize();
+}
@@ -1,22 +1,8 @@
 #include <Python.h>
 #include <iostream>
-#include <fstream>
 #include <filesystem>
 
-std::string find_python_home(std::filesystem::path bin) {
-    const auto local_home = bin / "python";
-    if (std::filesystem::exists(local_home)) {
-        return local_home.string();
-    }
-
-    auto home_file = bin / ".embedded_python.home";
-    if (!std::filesystem::exists(home_file)) {
-        home_file = bin / ".embedded_python-core.home";
-    }
-    auto stream = std::ifstream(home_file);
-    return std::string(std::istreambuf_iterator<char>(stream),
-                       std::istreambuf_iterator<char>());
-}
+#include "python_home.hpp"
 
 int main(int argc, const char* argv[]) {
     auto config = PyConfig{};
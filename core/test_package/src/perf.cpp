@@ -0,0 +1,44 @@
+#include <embedded_python/perf.hpp>
+#include <filesystem>
+#include <iostream>
+#include <string>
+
+#include "python_home.hpp"
+
+/// Enable the perf trampoline via `PyConfig` and check that Python writes the perf map
+int main(int argc, const char* argv[]) {
+    if (!embedded_python::perf_profiling_available()) {
+        std::cerr << "The perf trampoline is not available in this build of Python" << std::endl;
+        return 1;
+    }
+
+    auto config = PyConfig{};
+    PyConfig_InitIsolatedConfig(&config);
+    const auto python_home = find_python_home(std::filesystem::path(argv[0]).parent_path());
+    if (auto status = PyConfig_SetBytesString(&config, &config.home, python_home.c_str());
+        PyStatus_Exception(status)) {
+        PyConfig_Clear(&config);
+        return 1;
+    }
+    embedded_python::enable_perf_profiling(config);
+    if (auto status = Py_InitializeFromConfig(&config); PyStatus_Exception(status)) {
+        PyConfig_Clear(&config);
+        return 1;
+    }
+    PyConfig_Clear(&config);
+
+    const auto code = R"(
+import os, sys
+def work():
+    return sum(i * i for i in range(10_000))
+work()
+assert sys.is_stack_trampoline_active()
+perf_map = f"/tmp/perf-{os.getpid()}.map"
+with open(perf_map) as f:
+    assert "py::work:" in f.read(), "`work()` is missing from the perf map"
+os.remove(perf_map)
+print("The perf trampoline is active")
+)";
+    const auto result = PyRun_SimpleString(code);
+    return Py_FinalizeEx() < 0 || result != 0 ? 1 : 0;
+}
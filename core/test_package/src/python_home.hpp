@@ -0,0 +1,24 @@
+#pragma once
+#include <filesystem>
+#include <fstream>
+#include <iterator>
+#include <string>
+
+/// Find the Python home for an executable in `bin`, shared by the test programs
+///
+/// Prefer a deployed copy of the environment in `bin/python` (see `embedded_python_deploy()`),
+/// otherwise read the path from the home file written by `embedded_python_generate_home_file()`.
+inline std::string find_python_home(const std::filesystem::path& bin) {
+    const auto local_home = bin / "python";
+    if (std::filesystem::exists(local_home)) {
+        return local_home.string();
+    }
+
+    auto home_file = bin / ".embedded_python.home";
+    if (!std::filesystem::exists(home_file)) {
+        home_file = bin / ".embedded_python-core.home";
+    }
+    auto stream = std::ifstream(home_file);
+    return std::string(std::istreambuf_iterator<char>(stream),
+                       std::istreambuf_iterator<char>());
+}
@@ -21,3 +21,10 @@ endif()
 # See docstring of `embedded_python_generate_home_file()`. It's up to the user to pick if they
 # want to point the `-core` package (no `pip` package) or the full embedded environment.
 embedded_python_generate_home_file(".embedded_python.home" "${EmbeddedPython_ROOT_DIR}")
+
+# Single-file image of the environment (`embedded_python:image=True`), see
+# `embedded_python/image.hpp`
+if(EXISTS "${CMAKE_CURRENT_LIST_DIR}/embedded_python.image")
+    set(EmbeddedPython_IMAGE "${CMAKE_CURRENT_LIST_DIR}/embedded_python.image"
+        CACHE STRING "" FORCE)
+endif()
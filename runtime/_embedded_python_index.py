@@ -0,0 +1,92 @@
+"""Resolve imports from an index of module locations instead of searching `sys.path`
+
+The default `PathFinder` probes every `sys.path` entry in order for every import: it lists
+each directory and checks each `.zip`, and then lists the directory of every package on the
+way. The embedded environment doesn't change after packaging, so `embedded_python` writes an
+index of all module locations next to this file (`_embedded_python_index.marshal`, generated by
+`scripts/make_module_index.py`) and this finder looks modules up with a single `dict` access.
+
+It's activated by `embedded_python-index.pth` when `site` runs (the recipe adds `import site`
+to the `._pth` file for that) and it's inserted in front of `PathFinder`: builtin and frozen
+modules are unaffected. Anything which isn't in the index, or which the index can't answer
+safely, falls through to `PathFinder`. Top-level modules are only resolved from the index if
+no unknown entry precedes theirs in `sys.path` (e.g. a directory added by the application),
+and submodules only if the parent package's `__path__` still points where the index expects.
+"""
+
+import os
+import sys
+import marshal
+import zipimport
+from importlib.machinery import PathFinder
+from importlib.util import spec_from_file_location
+
+
+class IndexFinder:
+    def __init__(self, index_file):
+        with open(index_file, "rb") as f:
+            index = marshal.load(f)
+        prefix = os.path.join(os.path.dirname(index_file), index["prefix"])
+        self._entries = [os.path.normpath(os.path.join(prefix, e)) for e in index["entries"]]
+        self._entry_ids = {entry: i for i, entry in enumerate(self._entries)}
+        self._modules = index["modules"]
+        self._sys_path = None
+        self._trusted = set()
+
+    def _trusted_entries(self):
+        """IDs of the index entries which are not shadowed by an unknown `sys.path` entry"""
+        sys_path = tuple(sys.path)
+        if sys_path != self._sys_path:
+            self._sys_path = sys_path
+            self._trusted = set()
+            for path in sys_path:
+                entry_id = self._entry_ids.get(os.path.normpath(path) if path else None)
+                if entry_id is None:
+                    break
+                self._trusted.add(entry_id)
+        return self._trusted
+
+    def find_spec(self, fullname, path=None, target=None):
+        found = self._modules.get(fullname)
+        if found is None:
+            return None
+
+        entry_id, relative_path, is_package = found
+        entry = self._entries[entry_id]
+        parent = fullname.rpartition(".")[0]
+        if relative_path is None:  # in a `.zip`
+            file = None
+            location = os.path.join(entry, *parent.split(".")) if parent else entry
+        else:
+            file = os.path.join(entry, *relative_path.split("/"))
+            location = os.path.dirname(os.path.dirname(file) if is_package else file)
+
+        if path is None:
+            if parent or entry_id not in self._trusted_entries():
+                return None
+        elif not any(os.path.normpath(p) == location for p in path):
+            return None
+
+        if file is None:
+            return zipimport.zipimporter(location).find_spec(fullname)
+        locations = [os.path.dirname(file)] if is_package else None
+        return spec_from_file_location(fullname, file, submodule_search_locations=locations)
+
+    def invalidate_caches(self):
+        pass  # the index is fixed at packaging time
+
+
+def _install():
+    index_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{__name__}.marshal")
+    if not os.path.isfile(index_file):
+        return
+    if any(isinstance(finder, IndexFinder) for finder in sys.meta_path):
+        return
+    try:
+        position = sys.meta_path.index(PathFinder)
+    except ValueError:
+        position = len(sys.meta_path)
+    sys.meta_path.insert(position, IndexFinder(index_file))
+
+
+_install()
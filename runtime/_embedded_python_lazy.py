@@ -0,0 +1,58 @@
+"""Import selected modules lazily: their code only runs on first attribute access
+
+Large packages often import hundreds of submodules up front in their `__init__.py` even though
+most applications only use a small part of them. With `embedded_python:lazy_imports`, the
+recipe writes `embedded_python-lazy.pth` which calls `install()` with the configured names
+when `site` runs (the recipe adds `import site` to the `._pth` file for that).
+
+The finder is inserted at the front of `sys.meta_path`. For a matching module, it asks the
+other finders for the spec and wraps the loader in `importlib.util.LazyLoader`: `import name`
+then returns a module object right away and executes it when one of its attributes is first
+used. A name matches itself and all of its submodules and may be an `fnmatch` pattern, e.g.
+`scipy` or `matplotlib.*`. Only pure-Python modules (source, byte code, or in a `.zip`) are
+loaded lazily: extension modules and anything else are imported as usual.
+
+Lazy loading defers import errors and import-time side effects until first use. Packages
+which rely on those (e.g. registering plugins on import) should not be listed.
+"""
+
+import sys
+import fnmatch
+import zipimport
+from importlib.machinery import SourceFileLoader, SourcelessFileLoader
+from importlib.util import LazyLoader
+
+_lazy_loaders = (SourceFileLoader, SourcelessFileLoader, zipimport.zipimporter)
+
+
+class LazyFinder:
+    def __init__(self, names):
+        self._patterns = [n for n in names if any(c in n for c in "*?[")]
+        self._names = {n for n in names if n not in self._patterns}
+
+    def _is_lazy(self, fullname):
+        parts = fullname.split(".")
+        if any(".".join(parts[:i]) in self._names for i in range(1, len(parts) + 1)):
+            return True
+        return any(fnmatch.fnmatchcase(fullname, pattern) for pattern in self._patterns)
+
+    def find_spec(self, fullname, path=None, target=None):
+        if not self._is_lazy(fullname):
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if isinstance(spec.loader, _lazy_loaders):
+                spec.loader = LazyLoader(spec.loader)
+            return spec
+        return None
+
+
+def install(names):
+    """Load the modules in `names` (space or comma-separated names or patterns) lazily"""
+    names = [n for n in names.replace(",", " ").split() if n]
+    if names and not any(isinstance(f, LazyFinder) for f in sys.meta_path):
+        sys.meta_path.insert(0, LazyFinder(names))
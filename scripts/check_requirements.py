@@ -0,0 +1,48 @@
+"""Check that the canonical form of each requirement is equivalent to the original
+
+The `embedded_python` recipe normalizes `options.packages` so that equivalent sets of
+requirements share a `package_id`, see `make_package_list()` in `conanfile.py`. This script
+takes a JSON list of `[original, canonical]` pairs and uses `pip`'s own requirement parser to
+verify that both sides have the same name, extras, version specifiers, URL, and markers. Lines
+which are not requirements (e.g. `pip` options) and per-requirement options (e.g. `--hash`)
+must be identical apart from whitespace.
+
+It runs with the bootstrap Python which has `pip`.
+"""
+
+import re
+import sys
+import json
+
+from pip._vendor.packaging.requirements import InvalidRequirement, Requirement
+from pip._vendor.packaging.utils import canonicalize_name
+
+
+def parse(line):
+    line, *options = re.split(r"\s+(?=(?:--hash|--config-settings|-C)\b)", line, maxsplit=1)
+    if options:
+        return parse(line), " ".join(options[0].split())
+    try:
+        requirement = Requirement(line)
+    except InvalidRequirement:
+        return " ".join(line.split())
+    return (
+        canonicalize_name(requirement.name),
+        sorted(canonicalize_name(extra) for extra in requirement.extras),
+        requirement.specifier,
+        requirement.url,
+        str(requirement.marker) if requirement.marker else None,
+    )
+
+
+def main():
+    with open(sys.argv[1]) as f:
+        pairs = json.load(f)
+    mismatches = [(a, b) for a, b in pairs if parse(a) != parse(b)]
+    for original, canonical in mismatches:
+        print(f"'{original}' was normalized to '{canonical}' which is not equivalent")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
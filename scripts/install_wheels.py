@@ -0,0 +1,131 @@
+"""Install pre-fetched wheels into a prefix concurrently
+
+The packages of the embedded environment are fully pinned and installed with `--no-deps` so
+there is nothing to resolve: each wheel can be unpacked independently. `pip install` does this
+one wheel at a time. Here, we use `pip`'s own wheel installer (the same one `pip install` uses)
+from a pool of workers so that the result is identical: `RECORD`, `INSTALLER`, `REQUESTED`, and
+console scripts are written exactly like `pip` would. This runs in the bootstrap environment
+where the `pip` version is pinned by the recipe, so relying on `pip._internal` is safe enough.
+
+The workers are threads, unless the wheels are compiled to `.pyc`. `pip` compiles them with
+process-wide state (`captured_stdout()` and `warnings.catch_warnings()`) which isn't thread-safe.
+In that case, the workers are separate processes.
+
+With `--layer-cache`, each wheel is installed into its own immutable prefix in the cache, keyed
+by the hash of the wheel, instead of into a shared prefix. Existing cache entries are reused
+as is. The recipe then composes the final environment from those layers.
+"""
+
+import os
+import sys
+import shutil
+import hashlib
+import argparse
+import tempfile
+import concurrent.futures
+
+try:
+    from pip._internal.locations import get_scheme
+    from pip._internal.models.wheel import Wheel
+    from pip._internal.operations.install.wheel import install_wheel
+except ImportError as e:
+    sys.exit(f"The installed `pip` version is not supported by `install_wheels.py`: {e}")
+
+
+# e.g. `cp313t` for the free-threaded build of Python 3.13 (no `sys.abiflags` on Windows)
+INTERPRETER = f"cp{sys.version_info.major}{sys.version_info.minor}{getattr(sys, 'abiflags', '')}"
+
+
+def install(wheel_path, prefix, pycompile):
+    name = Wheel(os.path.basename(wheel_path)).name
+    install_wheel(
+        name,
+        wheel_path,
+        scheme=get_scheme(name, prefix=prefix),
+        req_description=name,
+        pycompile=pycompile,
+        warn_script_location=False,
+        requested=True,
+    )
+    return name
+
+
+def install_layer(wheel_path, layer_cache, pycompile):
+    """Install `wheel_path` into its own layer in `layer_cache` and return the layer's path
+
+    Layers are created in a temporary directory and atomically renamed into place so that
+    concurrent builds sharing the same cache never see partial layers.
+    """
+    with open(wheel_path, "rb") as f:
+        key = hashlib.sha256(f.read()).hexdigest() + ("-pyc" if pycompile else "")
+    # The same (pure Python) wheel is installed into `lib/python3.X[t]` depending on the
+    # interpreter, so the layers of different Python versions and ABIs can't be shared
+    key += f"-{INTERPRETER}"
+    layer = os.path.join(layer_cache, key[:2], key)
+    if os.path.isdir(layer):
+        return layer
+
+    os.makedirs(os.path.dirname(layer), exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=f".{key}.", dir=os.path.dirname(layer))
+    try:
+        install(wheel_path, tmp, pycompile)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    try:
+        os.rename(tmp, layer)
+    except OSError:
+        if not os.path.isdir(layer):
+            raise
+        shutil.rmtree(tmp)  # another build created the same layer in the meantime
+    return layer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("wheels", help="file with the paths of the wheels, one per line")
+    destination = parser.add_mutually_exclusive_group(required=True)
+    destination.add_argument("--prefix", help="installation prefix")
+    destination.add_argument("--layer-cache", help="directory of per-wheel installation layers")
+    parser.add_argument("--output", help="with `--layer-cache`: file to list the layers in")
+    parser.add_argument("--no-compile", action="store_true", help="don't compile to `.pyc`")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="number of workers")
+    args = parser.parse_args()
+
+    with open(args.wheels) as f:
+        wheels = [line.strip() for line in f if line.strip()]
+
+    if args.layer_cache:
+        task, destination = install_layer, args.layer_cache
+    else:
+        task, destination = install, args.prefix
+
+    failed = False
+    results = {}
+    if args.no_compile:
+        pool = concurrent.futures.ThreadPoolExecutor
+    else:
+        pool = concurrent.futures.ProcessPoolExecutor
+    with pool(max_workers=args.jobs) as executor:
+        futures = {
+            executor.submit(task, wheel, destination, not args.no_compile): wheel
+            for wheel in wheels
+        }
+        for future in concurrent.futures.as_completed(futures):
+            wheel = futures[future]
+            try:
+                results[wheel] = future.result()
+                print(f"Installed {os.path.basename(wheel)}: {results[wheel]}")
+            except Exception as e:
+                print(f"Failed to install {wheel}: {e}", file=sys.stderr)
+                failed = True
+
+    if args.output and not failed:
+        with open(args.output, "w") as f:
+            f.write("\n".join(results[wheel] for wheel in wheels))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
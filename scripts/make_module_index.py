@@ -0,0 +1,126 @@
+"""Generate the module index for `_embedded_python_index`, see `runtime/_embedded_python_index.py`
+
+This runs with the embedded Python of the package being built so that `sys.path` and the module
+suffixes are exactly those of the final environment. Each `sys.path` entry which is inside the
+prefix is scanned in order, following the same rules as `importlib`'s finders:
+- directories: a package (a folder with `__init__`) wins over a module with the same name and
+  extension modules win over `.py` sources which win over legacy `.pyc` files,
+- `.zip` files: packages first, then `.pyc`, then `.py`,
+- the first entry which has a top-level name provides it together with all of its submodules.
+
+Namespace packages and everything inside of them are left out of the index. The finder falls
+back to the regular `PathFinder` for those.
+"""
+
+import os
+import sys
+import marshal
+import zipfile
+import argparse
+from importlib.machinery import BYTECODE_SUFFIXES, EXTENSION_SUFFIXES, SOURCE_SUFFIXES
+
+SUFFIXES = EXTENSION_SUFFIXES + SOURCE_SUFFIXES + BYTECODE_SUFFIXES
+ZIP_SUFFIXES = BYTECODE_SUFFIXES + SOURCE_SUFFIXES
+
+
+def directory_modules(path, package="", relative_path=""):
+    """Return `{name: (relative_path, is_package)}` for the modules in the directory `path`"""
+    try:
+        names = sorted(os.listdir(path))
+    except OSError:
+        return {}
+
+    modules = {}
+    for name in names:
+        full_path = os.path.join(path, name)
+        if not name.isidentifier() or not os.path.isdir(full_path):
+            continue
+        init = next(
+            (f"__init__{s}" for s in SUFFIXES if os.path.isfile(f"{full_path}/__init__{s}")), None
+        )
+        if init:
+            modules[package + name] = (f"{relative_path}{name}/{init}", True)
+            modules.update(
+                directory_modules(full_path, f"{package}{name}.", f"{relative_path}{name}/")
+            )
+
+    for suffix in SUFFIXES:
+        for name in names:
+            module = name[: -len(suffix)]
+            if name.endswith(suffix) and module.isidentifier() and module != "__init__":
+                modules.setdefault(package + module, (relative_path + name, False))
+    return modules
+
+
+def zip_modules(path):
+    """Return `{name: (None, is_package)}` for the modules in the `.zip` file `path`"""
+    with zipfile.ZipFile(path) as zf:
+        names = set(zf.namelist())
+
+    packages = set()
+    for name in names:
+        directory, _, file_name = name.rpartition("/")
+        if directory and file_name in (f"__init__{s}" for s in ZIP_SUFFIXES):
+            packages.add(directory.replace("/", "."))
+
+    def is_reachable(package):
+        """Only from the top level through regular packages (no namespace packages in between)"""
+        parts = package.split(".")
+        return all(".".join(parts[:i]) in packages for i in range(1, len(parts)))
+
+    packages = {package for package in packages if is_reachable(package)}
+
+    modules = {package: (None, True) for package in packages}
+    for suffix in ZIP_SUFFIXES:
+        for name in sorted(names):
+            module = name[: -len(suffix)].replace("/", ".")
+            parent, _, base = module.rpartition(".")
+            if name.endswith(suffix) and base.isidentifier() and base != "__init__":
+                if not parent or parent in packages:
+                    modules.setdefault(module, (None, False))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prefix", required=True, help="root of the embedded environment")
+    parser.add_argument("--output", required=True, help="path of the index file")
+    args = parser.parse_args()
+
+    prefix = os.path.normpath(os.path.abspath(args.prefix))
+    output_dir = os.path.dirname(os.path.abspath(args.output))
+
+    entries = []
+    index = {}
+    for path in sys.path:
+        path = os.path.normpath(os.path.abspath(path)) if path else None
+        if not path or path in entries or os.path.commonpath([path, prefix]) != prefix:
+            continue
+        if os.path.isdir(path):
+            modules = directory_modules(path)
+        elif zipfile.is_zipfile(path):
+            modules = zip_modules(path)
+        else:
+            continue
+
+        taken = {name.partition(".")[0] for name in index}
+        entry_id = len(entries)
+        entries.append(path)
+        for name, (relative_path, is_package) in modules.items():
+            if name.partition(".")[0] not in taken:
+                index[name] = (entry_id, relative_path, is_package)
+
+    with open(args.output, "wb") as f:
+        marshal.dump(
+            {
+                "prefix": os.path.relpath(prefix, output_dir),
+                "entries": [os.path.relpath(entry, prefix) for entry in entries],
+                "modules": index,
+            },
+            f,
+        )
+    print(f"Indexed {len(index)} modules in {len(entries)} `sys.path` entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Trim the zipped standard library down to the modules which the environment can import
+
+This runs with the embedded Python of the package being built (so that the byte code format
+matches) and finds the closure of the standard library modules which are needed by:
+- everything in `site-packages`: the imports in the source code and the module names which
+  appear as C strings in the extension modules and shared libraries,
+- the interpreter itself: the `sys.modules` of a fresh interpreter, plus `site` and a few
+  modules which are imported from C code (e.g. `time.strptime()` -> `_strptime`),
+- the recipe's own tools which run with the trimmed interpreter after this (e.g. `compileall`
+  and the scripts passed via `--scan`) and the runtime finders which it installs later,
+- the user's allow-list (for dynamic imports which static analysis can't see).
+
+The analysis works at the level of top-level modules: if any part of a package is needed, the
+entire package is kept. This is coarse, but robust against imports within packages which are
+only resolved at runtime. Imports which don't happen when a module is imported are skipped:
+`if __name__ == "__main__":` blocks, `__main__` submodules, `_test()` doctest runners, and the
+interactive-only imports of `site`. The trimmed `.zip` is written to a new file and the report
+lists what was kept and dropped.
+"""
+
+import os
+import re
+import dis
+import sys
+import json
+import types
+import fnmatch
+import marshal
+import zipfile
+import argparse
+import subprocess
+
+# Imported at runtime by name: `codecs.lookup()` searches `encodings.<name>`, `site` is imported
+# on startup when embedding (but not by the `python` exe in isolated mode), and `sysconfig`
+# derives the name of its `_sysconfigdata_*` module from the platform. The recipe runs
+# `python -m compileall` on `site-packages` after trimming.
+ALWAYS_KEEP = ["encodings", "site", "_sysconfigdata*", "compileall"]
+
+# Imported by the `libpython` C code, e.g. `time.strptime()` -> `_strptime`. We can't find these
+# by scanning `libpython` for module names because it contains `sys.stdlib_module_names`.
+RUNTIME_IMPORTS = ["_strptime", "copyreg", "linecache", "traceback", "warnings"]
+
+# Imports which only happen in an interactive session: `help()` and tab completion
+INTERACTIVE_IMPORTS = {"_sitebuiltins": {"pydoc"}, "site": {"rlcompleter", "readline", "_pyrepl"}}
+
+# Module names in binaries are NUL-terminated C strings, e.g. `PyImport_ImportModule("numbers")`
+C_STRING = re.compile(rb"(?<=\x00)[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*(?=\x00)")
+
+BINARY_SUFFIX = re.compile(r"\.(so|pyd|dll|dylib)(\.[\d.]+)?$")
+
+
+def top_level(name):
+    return name.partition(".")[0]
+
+
+def main_block(instructions):
+    """The offsets of the `if __name__ == "__main__":` block which doesn't run on import
+
+    Many modules import test or demo dependencies there, e.g. `heapq` imports `doctest`.
+    """
+    for i in range(len(instructions) - 3):
+        load_a, load_b, compare = instructions[i : i + 3]
+        if compare.opname == "COMPARE_OP" and {load_a.argval, load_b.argval} == {
+            "__name__",
+            "__main__",
+        }:
+            jump = next(ins for ins in instructions[i + 3 :] if "JUMP" in ins.opname)
+            if "IF_FALSE" in jump.opname:
+                return range(jump.offset, jump.argval)
+    return range(0)
+
+
+def imported_names(code):
+    """Yield the absolute imports of `code`, including nested functions and classes
+
+    Relative imports always stay within the same top-level package so they can be skipped.
+    """
+    instructions = list(dis.get_instructions(code))
+    skip = main_block(instructions) if code.co_name == "<module>" else range(0)
+    for i, instruction in enumerate(instructions):
+        if instruction.opname != "IMPORT_NAME" or instruction.offset in skip:
+            continue
+        level = instructions[i - 2].argval if i >= 2 else 0  # `LOAD_CONST level, fromlist`
+        if not isinstance(level, int) or level == 0:
+            yield instruction.argval
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType) and const.co_name != "_test":  # doctest runners
+            yield from imported_names(const)
+
+
+def code_imports(source, filename):
+    try:
+        code = compile(source, filename, "exec", dont_inherit=True)
+    except (SyntaxError, ValueError):
+        return set()  # e.g. test data or files for other Python versions
+    return {top_level(name) for name in imported_names(code)}
+
+
+def source_imports(path):
+    with open(path, "rb") as f:
+        return code_imports(f.read(), path)
+
+
+def pth_imports(path):
+    """Lines starting with `import` are executed by `site`"""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        lines = [line for line in f if line.startswith(("import ", "import\t"))]
+    return code_imports("".join(lines), path)
+
+
+def binary_imports(path):
+    with open(path, "rb") as f:
+        return {top_level(match.decode()) for match in C_STRING.findall(f.read())}
+
+
+def startup_modules():
+    """Modules which are imported by a fresh interpreter before any user code runs"""
+    code = "import sys; print('\\n'.join(sys.modules))"
+    p = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    return {top_level(name) for name in p.stdout.split()}
+
+
+def scan_site_packages(site_packages):
+    """Top-level names imported by the source files, `.pth` files, and binaries"""
+    names = set()
+    for root, _, file_names in os.walk(site_packages):
+        for file_name in file_names:
+            path = os.path.join(root, file_name)
+            if file_name.endswith(".py"):
+                names |= source_imports(path)
+            elif file_name.endswith(".pth"):
+                names |= pth_imports(path)
+            elif BINARY_SUFFIX.search(file_name):
+                names |= binary_imports(path)
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("zip", help="the zipped standard library")
+    parser.add_argument("--output", required=True, help="path of the trimmed `.zip`")
+    parser.add_argument("--report", required=True, help="path of the JSON report")
+    parser.add_argument("--site-packages", help="installed packages to keep the imports of")
+    parser.add_argument("--extensions", help="directory of the stdlib extension modules")
+    parser.add_argument("--keep", action="append", default=[], help="module name or pattern")
+    parser.add_argument("--scan", action="append", default=[], help="script to keep the imports of")
+    args = parser.parse_args()
+
+    with zipfile.ZipFile(args.zip) as zf:
+        entries = zf.infolist()
+        modules = {}  # top-level name -> zip entries
+        for info in entries:
+            name = info.filename.split("/")[0]
+            modules.setdefault(name.removesuffix(".pyc"), []).append(info)
+
+        extensions = {}  # top-level name -> file: not in the zip but they may import from it
+        if args.extensions:
+            for file_name in os.listdir(args.extensions):
+                if BINARY_SUFFIX.search(file_name):
+                    extensions[file_name.split(".")[0]] = os.path.join(args.extensions, file_name)
+
+        roots = startup_modules()
+        if args.site_packages:
+            roots |= scan_site_packages(args.site_packages)
+        for script in args.scan:
+            roots |= source_imports(script)
+        for pattern in ALWAYS_KEEP + RUNTIME_IMPORTS + args.keep:
+            roots |= set(fnmatch.filter(modules, top_level(pattern)))
+        # Anything which isn't a module name (e.g. data files) is kept as is
+        roots |= {name for name in modules if not name.isidentifier()}
+
+        needed = set()
+        pending = [name for name in roots if name in modules or name in extensions]
+        while pending:
+            name = pending.pop()
+            if name in needed:
+                continue
+            needed.add(name)
+            if name in modules:
+                dependencies = set()
+                for info in modules[name]:
+                    if info.filename.endswith(".pyc") and not info.filename.endswith(
+                        "/__main__.pyc"
+                    ):
+                        code = marshal.loads(zf.read(info)[16:])  # skip the `.pyc` header
+                        dependencies |= {top_level(n) for n in imported_names(code)}
+            else:
+                dependencies = binary_imports(extensions[name])
+            dependencies -= INTERACTIVE_IMPORTS.get(name, set())
+            pending += [n for n in dependencies if n in modules or n in extensions]
+
+        with zipfile.ZipFile(args.output, "w") as out:
+            for info in entries:
+                if info.filename.split("/")[0].removesuffix(".pyc") in needed:
+                    out.writestr(info, zf.read(info))
+
+    dropped = {
+        name: sum(info.compress_size for info in infos)
+        for name, infos in modules.items()
+        if name not in needed
+    }
+    report = {
+        "size_before": os.path.getsize(args.zip),
+        "size_after": os.path.getsize(args.output),
+        "kept": sorted(name for name in modules if name in needed),
+        "dropped": dict(sorted(dropped.items())),
+        "keep": args.keep,
+    }
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(
+        f"Trimmed the standard library from {len(modules)} to {len(report['kept'])} top-level "
+        f"modules: {report['size_before']} -> {report['size_after']} bytes"
+    )
+
+
+if __name__ == "__main__":
+    main()
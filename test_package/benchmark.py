@@ -0,0 +1,146 @@
+"""Measure the startup latency of an embedded Python environment
+
+This is run by `conanfile.py` when the `benchmark` option is enabled, but it can also be used
+on its own. It measures:
+- cold and warm `Py_InitializeFromConfig()` from the `benchmark` embedding host: cold is the
+  first initialization in a fresh process, warm are repeated initializations in that process,
+- `python -c pass` with the packaged interpreter,
+- `python -c "import <module>"` for the top-level modules of each package in `packages.txt`,
+  after running `site` like an embedding application would (the `python` executable doesn't in
+  the isolated `._pth` mode) so that the `module_index` and `lazy_imports` hooks are active,
+- the run time and memory usage of `memory_workload.py` (not on Windows), e.g. to compare the
+  `embedded_python-core:allocator` options.
+
+All times are in seconds and memory sizes in bytes, as listed in the `units` of the report. The
+results are written to a JSON file together with any `--label` given on the command line (e.g.
+the recipe options) so that reports of different runs can be compared.
+"""
+
+import sys
+import json
+import time
+import pathlib
+import argparse
+import platform
+import statistics
+import subprocess
+
+# Executed with the embedded Python: map distribution names to their top-level modules
+FIND_MODULES = """
+import json, sys
+from importlib import metadata
+names = {metadata.distribution(name).name: name for name in sys.argv[1:]}
+modules = {name: [] for name in names.values()}
+for module, dists in metadata.packages_distributions().items():
+    if module.startswith("_") or module.endswith("-stubs"):
+        continue
+    for dist in dists:
+        if dist in names:
+            modules[names[dist]].append(module)
+print(json.dumps(modules))
+"""
+
+SITE = "import site; site.main(); "
+
+
+def summarize(timings):
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "runs": len(timings),
+    }
+
+
+def time_process(command, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_embed(exe, repeat, warm_runs):
+    cold, warm = [], []
+    for _ in range(repeat):
+        p = subprocess.run([exe, str(warm_runs)], check=True, capture_output=True, text=True)
+        result = json.loads(p.stdout)
+        cold.append(result["cold"])
+        warm.extend(result["warm"])
+    return {"cold": summarize(cold), "warm": summarize(warm)}
+
+
+def bench_memory(python, repeat):
+    workload = pathlib.Path(__file__).with_name("memory_workload.py")
+    results = []
+    for _ in range(repeat):
+        p = subprocess.run([python, workload], check=True, capture_output=True, text=True)
+        results.append(json.loads(p.stdout))
+    return {
+        key: summarize([r[key] for r in results])
+        for key in ["time", "peak_rss", "final_rss"]
+        if results[0][key] is not None
+    }
+
+
+def read_packages(packages_file):
+    if not packages_file:
+        return []
+    with open(packages_file) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def find_modules(python, packages):
+    if not packages:
+        return {}
+    p = subprocess.run(
+        [python, "-c", FIND_MODULES, *packages], check=True, capture_output=True, text=True
+    )
+    return json.loads(p.stdout)
+
+
+def bench_imports(python, packages, repeat):
+    results = {}
+    for package, modules in find_modules(python, packages).items():
+        results[package] = {
+            module: summarize(time_process([python, "-c", SITE + f"import {module}"], repeat))
+            for module in sorted(modules)
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--python", required=True, help="the embedded Python executable")
+    parser.add_argument("--embed", help="the `benchmark` embedding host executable")
+    parser.add_argument("--packages", help="`licenses/packages.txt` of the environment")
+    parser.add_argument("--output", required=True, help="path of the JSON report")
+    parser.add_argument("--repeat", type=int, default=10, help="number of runs per measurement")
+    parser.add_argument("--label", action="append", default=[], help="extra `key=value` info")
+    args = parser.parse_args()
+
+    report = {
+        "labels": dict(label.split("=", 1) for label in args.label),
+        "platform": platform.platform(),
+        "python_c_pass": summarize(time_process([args.python, "-c", "pass"], args.repeat)),
+        "imports": bench_imports(args.python, read_packages(args.packages), args.repeat),
+    }
+    if args.embed:
+        report["initialize"] = bench_embed(args.embed, args.repeat, warm_runs=args.repeat)
+    if sys.platform != "win32":
+        report["memory"] = bench_memory(args.python, min(args.repeat, 3))
+    units = {"time": "seconds", "peak_rss": "bytes", "final_rss": "bytes"}
+    report["units"] = {
+        key: units if key == "memory" else "seconds"
+        for key in ["python_c_pass", "imports", "initialize", "memory"]
+        if key in report
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import sys
+import json
 import pathlib
 import subprocess
 from conan import ConanFile
@@ -17,9 +18,10 @@ class TestEmbeddedPython(ConanFile):
     name = "test_embedded_python"
     settings = "os", "compiler", "build_type", "arch"
     generators = "CMakeToolchain", "CMakeDeps", "VirtualRunEnv"
-    options = {"env": [None, "ANY"]}
+    options = {"env": [None, "ANY"], "benchmark": [False, True]}
     default_options = {
         "env": None,
+        "benchmark": False,
         "embedded_python-core/*:version": "3.11.5",
     }
     package_type = "shared-library"
@@ -37,6 +39,11 @@ class TestEmbeddedPython(ConanFile):
         exe = "python.exe" if sys.platform == "win32" else "python3"
         return self._package_path / "embedded_python" / exe
 
+    @property
+    def _lazy_imports(self):
+        lazy_imports = self.dependencies["embedded_python"].options.lazy_imports
+        return str(lazy_imports or "").replace(",", " ").split()
+
     def layout(self):
         cmake_layout(self)
 
@@ -91,13 +98,120 @@ class TestEmbeddedPython(ConanFile):
         license_files = [license_dir / "LICENSE.txt"]
         if self.options.env:
             license_files += [license_dir / "package_licenses.txt"]
+            license_files += [license_dir / "package_licenses.json"]
+            license_files += [license_dir / "package_licenses.spdx.json"]
             license_files += [license_dir / "packages.txt"]
 
         for file in license_files:
             print(f"{file}: {file.stat().st_size}")
 
+    def _test_vendored_libraries(self):
+        """Ensure that deduplicated vendored libraries point to an identical copy"""
+        report_file = self._package_path / "reports/vendored_libraries.json"
+        if not report_file.exists():
+            return
+
+        report = json.loads(report_file.read_text())
+        lib = self._package_path / "embedded_python/lib"
+        site_packages = next(path for path in lib.glob("python3*/site-packages") if path.is_dir())
+        for group in report["duplicates"]:
+            for path in group["replaced"]:
+                library = site_packages / path
+                assert library.is_symlink(), f"{library} should be a symlink"
+                assert library.resolve() == (site_packages / group["kept"]).resolve(), library
+        print(f"Vendored libraries: {report['bytes_saved']} bytes saved")
+
+    def _test_module_index(self):
+        """Ensure that `site` installs the module index finder and that it resolves imports
+
+        `site` must run on its own: the `._pth` file also applies to embedding hosts on Windows.
+        """
+        if not self.dependencies["embedded_python"].options.module_index:
+            return
+
+        code = (
+            "import sys, json; "
+            "finder = [f for f in sys.meta_path if type(f).__name__ == 'IndexFinder']; "
+            "assert finder and finder[0].find_spec('json') is not None, sys.meta_path"
+        )
+        self.run(f'{self._py_exe} -c "{code}"')
+
+    def _test_lazy_imports(self):
+        """Ensure that the `lazy_imports` modules are loaded lazily and compare the import time
+
+        `site` must install the finder on its own: the `._pth` file also applies to embedding
+        hosts on Windows. For the eager import time, the finder is removed again.
+        """
+        names = self._lazy_imports
+        if not names:
+            return
+
+        code = (
+            "import sys, time; {setup}"
+            "start = time.perf_counter(); import {name}; "
+            "print(f'{{(time.perf_counter() - start) * 1000:.1f}}'); "
+            "lazy = type(sys.modules['{name}']).__name__ == '_LazyModule'; "
+            "assert lazy == {lazy}, type(sys.modules['{name}'])"
+        )
+        eager = (
+            "sys.meta_path[:] = [f for f in sys.meta_path if type(f).__name__ != 'LazyFinder']; "
+        )
+        for name in [n for n in names if not any(c in n for c in "*?[")]:
+            times = {}
+            for mode, setup in [("eager", eager), ("lazy", "")]:
+                p = subprocess.run(
+                    [self._py_exe, "-c", code.format(setup=setup, name=name, lazy=not setup)],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                )
+                times[mode] = p.stdout.strip()
+            print(f"import {name}: {times['eager']} ms eager, {times['lazy']} ms lazy")
+
+    def _test_image(self):
+        """Ensure that the application runs from the single-file image"""
+        if not self.dependencies["embedded_python"].options.image:
+            return
+
+        image = self._package_path / "embedded_python.image"
+        cache = pathlib.Path(self.build_folder, "image_cache")
+        exe = pathlib.Path(self.cpp.build.bindir, "image").absolute()
+        self.run(f'"{exe}" "{image}" "{cache}"', env="conanrun")
+        self.run(f'"{exe}" "{image}" "{cache}"', env="conanrun")  # already extracted
+
+    def _benchmark(self):
+        """Measure startup latency and write a JSON report, see `benchmark.py`"""
+        name = str(self.options.env) if self.options.env else "baseline"
+        core_options = self.dependencies["embedded_python-core"].options
+        labels = {
+            "env": name,
+            "python": core_options.version,
+            "zip_stdlib": core_options.get_safe("zip_stdlib", "stored"),
+            "allocator": core_options.get_safe("allocator", "default"),
+            "perf_profiling": core_options.get_safe("perf_profiling", False),
+            "lazy_imports": ",".join(self._lazy_imports) or "none",
+        }
+        output = pathlib.Path(self.build_folder, f"benchmark-{name}.json")
+        args = [
+            f"--python {self._py_exe}",
+            f"--embed {pathlib.Path(self.cpp.build.bindir, 'benchmark').absolute()}",
+            f"--output {output}",
+            *(f"--label {key}={value}" for key, value in labels.items()),
+        ]
+        if self.options.env:
+            args.append(f"--packages {self._package_path / 'licenses/packages.txt'}")
+        self.run(
+            f"{sys.executable} {project_root / 'benchmark.py'} {' '.join(args)}", env="conanrun"
+        )
+
     def test(self):
         self._test_env()
         self._test_libpython_path()
         self._test_embed()
         self._test_licenses()
+        self._test_vendored_libraries()
+        self._test_module_index()
+        self._test_lazy_imports()
+        self._test_image()
+        if self.options.benchmark:
+            self._benchmark()
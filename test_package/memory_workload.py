@@ -0,0 +1,76 @@
+"""An allocation-heavy workload for comparing memory allocators, see `benchmark.py`
+
+It mimics a long-running host process: many rounds of building and dropping object graphs of
+mixed sizes while a slowly changing set of survivors stays alive and fragments the heap. If
+`numpy` is available, array buffers of varying sizes are allocated as well. The run time, the
+peak resident set size (RSS), and the RSS at the end (after a full collection) are printed as
+JSON. The final RSS shows how much memory the allocator returns or is able to reuse.
+"""
+
+import gc
+import sys
+import json
+import time
+import random
+import resource
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def current_rss():
+    """Resident set size in bytes (Linux only, else `None`)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return None
+
+
+def peak_rss():
+    """Peak resident set size in bytes: `ru_maxrss` is in kilobytes on Linux, bytes on macOS"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def churn(rounds, rng):
+    survivors = []
+    for _ in range(rounds):
+        garbage = [
+            {
+                "id": i,
+                "name": f"item-{i}" * rng.randint(1, 16),
+                "values": list(range(rng.randint(0, 64))),
+                "pair": (i, str(i)),
+            }
+            for i in range(2_000)
+        ]
+        survivors += rng.sample(garbage, 100)
+        if np is not None:
+            arrays = [np.ones(rng.randint(1, 200_000)) for _ in range(20)]
+            survivors.append(arrays[rng.randrange(len(arrays))])
+        if len(survivors) > 20_000:
+            del survivors[: len(survivors) // 2]
+    return survivors
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    start = time.perf_counter()
+    survivors = churn(rounds, random.Random(42))
+    elapsed = time.perf_counter() - start
+    del survivors
+    gc.collect()
+    result = {
+        "time": elapsed,
+        "peak_rss": peak_rss(),
+        "final_rss": current_rss(),
+        "numpy": np is not None,
+    }
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#include <Python.h>
+#include <chrono>
+#include <cstdlib>
+#include <filesystem>
+#include <iostream>
+
+#include "../../core/test_package/src/python_home.hpp"
+
+/// Return the time it takes to initialize an isolated interpreter, or a negative value on error
+double time_initialize(const std::string& python_home) {
+    const auto start = std::chrono::steady_clock::now();
+
+    auto config = PyConfig{};
+    PyConfig_InitIsolatedConfig(&config);
+    if (auto status = PyConfig_SetBytesString(&config, &config.home, python_home.c_str());
+        PyStatus_Exception(status)) {
+        PyConfig_Clear(&config);
+        return -1;
+    }
+    if (auto status = Py_InitializeFromConfig(&config); PyStatus_Exception(status)) {
+        PyConfig_Clear(&config);
+        return -1;
+    }
+    PyConfig_Clear(&config);
+
+    const auto stop = std::chrono::steady_clock::now();
+    Py_Finalize();
+    return std::chrono::duration<double>(stop - start).count();
+}
+
+/// Print the cold (first in this process) and warm (repeated) initialization times as JSON
+int main(int argc, const char* argv[]) {
+    const auto warm_runs = argc > 1 ? std::atoi(argv[1]) : 10;
+    const auto python_home = find_python_home(std::filesystem::path(argv[0]).parent_path());
+
+    const auto cold = time_initialize(python_home);
+    if (cold < 0) {
+        return 1;
+    }
+
+    std::cout << "{\"cold\": " << cold << ", \"warm\": [";
+    for (auto i = 0; i < warm_runs; ++i) {
+        const auto warm = time_initialize(python_home);
+        if (warm < 0) {
+            return 1;
+        }
+        std::cout << (i ? ", " : "") << warm;
+    }
+    std::cout << "]}" << std::endl;
+}
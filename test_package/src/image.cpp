@@ -0,0 +1,41 @@
+#include <embedded_python/image.hpp>
+#include <iostream>
+
+/// Run Python from the single-file image: the standard library is imported from inside of
+/// the image and extension modules from the extracted cache folder
+int main(int argc, const char* argv[]) {
+    if (argc < 3) {
+        std::cerr << "Usage: image <embedded_python.image> <cache folder>" << std::endl;
+        return 1;
+    }
+
+    auto config = PyConfig{};
+    PyConfig_InitIsolatedConfig(&config);
+    try {
+        embedded_python::configure_from_image(config, argv[1], argv[2]);
+    } catch (const std::exception& e) {
+        std::cerr << e.what() << std::endl;
+        PyConfig_Clear(&config);
+        return 1;
+    }
+    if (auto status = Py_InitializeFromConfig(&config); PyStatus_Exception(status)) {
+        PyConfig_Clear(&config);
+        return 1;
+    }
+    PyConfig_Clear(&config);
+
+    const auto code = R"(
+import sys, json, decimal, importlib
+assert ".image" in json.__file__, json.__file__
+# Extension modules may be built into the interpreter (on Windows or with `builtin_modules`)
+candidates = ["_json", "_decimal", "_ctypes", "_ssl"]
+extension = next((m for m in candidates if m not in sys.builtin_module_names), None)
+if extension:
+    path = importlib.import_module(extension).__file__
+    assert ".image" not in path, path
+print(sys.version)
+print("\n".join(sys.path))
+)";
+    const auto result = PyRun_SimpleString(code);
+    return Py_FinalizeEx() < 0 || result != 0 ? 1 : 0;
+}